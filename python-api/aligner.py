@@ -0,0 +1,172 @@
+"""Word alignment for building the word translation map.
+
+Implements IBM Model 1 (expectation maximisation over lexical translation
+probabilities t(hindi | english)) on NumPy count arrays. Every co-occurring word
+pair in a sentence pair becomes one entry in flat index arrays, so each EM
+iteration is a handful of vectorised ``bincount`` calls instead of nested
+Python loops over the vocabulary.
+"""
+
+import numpy as np
+
+# Index of the NULL English word that absorbs Hindi function words
+NULL_ID = 0
+
+
+class EncodedCorpus:
+    """Tokenized sentence pairs as flat integer arrays
+
+    english_ids holds each sentence's token ids preceded by NULL_ID, hindi_ids
+    the Hindi token ids; the *_lengths arrays give the entries per sentence and
+    the *_starts arrays where each sentence begins. Pairs that are empty or
+    longer than max_sentence_length tokens on either side are skipped.
+    """
+
+    def __init__(self, sentence_pairs, max_sentence_length=100):
+        self.english_vocab = {"": NULL_ID}
+        self.hindi_vocab = {}
+        english_ids, hindi_ids, english_lengths, hindi_lengths = [], [], [], []
+
+        for english_tokens, hindi_tokens in sentence_pairs:
+            if not english_tokens or not hindi_tokens:
+                continue
+            if len(english_tokens) > max_sentence_length or len(hindi_tokens) > max_sentence_length:
+                continue
+
+            english_ids.append(NULL_ID)
+            english_ids.extend(self.english_vocab.setdefault(token, len(self.english_vocab)) for token in english_tokens)
+            hindi_ids.extend(self.hindi_vocab.setdefault(token, len(self.hindi_vocab)) for token in hindi_tokens)
+            english_lengths.append(len(english_tokens) + 1)
+            hindi_lengths.append(len(hindi_tokens))
+
+        self.english_ids = np.asarray(english_ids, dtype=np.int64)
+        self.hindi_ids = np.asarray(hindi_ids, dtype=np.int64)
+        self.english_lengths = np.asarray(english_lengths, dtype=np.int64)
+        self.hindi_lengths = np.asarray(hindi_lengths, dtype=np.int64)
+        self.english_starts = np.cumsum(self.english_lengths) - self.english_lengths
+        self.hindi_starts = np.cumsum(self.hindi_lengths) - self.hindi_lengths
+
+    def __len__(self):
+        return len(self.hindi_lengths)
+
+    def english_words(self):
+        """Object array mapping English ids back to words"""
+        return _vocab_array(self.english_vocab)
+
+    def hindi_words(self):
+        """Object array mapping Hindi ids back to words"""
+        return _vocab_array(self.hindi_vocab)
+
+
+def _vocab_array(vocab):
+    words = np.empty(len(vocab), dtype=object)
+    words[list(vocab.values())] = list(vocab.keys())
+    return words
+
+
+def first_max_per_group(values, group_starts):
+    """Index of the first maximum within each contiguous group of values"""
+    group_sizes = np.diff(np.r_[group_starts, len(values)])
+    group_max = np.maximum.reduceat(values, group_starts)
+    candidates = np.flatnonzero(values == np.repeat(group_max, group_sizes))
+    group_of = np.repeat(np.arange(len(group_starts)), group_sizes)[candidates]
+    return candidates[np.r_[True, group_of[1:] != group_of[:-1]]]
+
+
+class IBMModel1:
+    """t(hindi | english) estimated with IBM Model 1 over an EncodedCorpus
+
+    pair_english, pair_hindi and probabilities list every co-occurring word
+    pair with its translation probability, grouped by English id.
+    """
+
+    def __init__(self, corpus, iterations=5):
+        self.corpus = corpus
+        if not len(corpus):
+            empty = np.zeros(0, dtype=np.int64)
+            self.pair_english = self.pair_hindi = self.pair_index = empty
+            self.entry_english = self.entry_hindi = empty
+            self.probabilities = np.zeros(0)
+            return
+
+        english_ids, hindi_ids = corpus.english_ids, corpus.hindi_ids
+        english_lengths, hindi_lengths = corpus.english_lengths, corpus.hindi_lengths
+
+        # One entry per (hindi token, english token) in the same sentence pair
+        hindi_sentence = np.repeat(np.arange(len(hindi_lengths)), hindi_lengths)
+        links_per_hindi = english_lengths[hindi_sentence]
+        entry_hindi = np.repeat(np.arange(len(hindi_ids)), links_per_hindi)
+        group_start = np.repeat(np.cumsum(links_per_hindi) - links_per_hindi, links_per_hindi)
+        entry_english = (
+            np.repeat(corpus.english_starts[hindi_sentence], links_per_hindi)
+            + np.arange(len(entry_hindi)) - group_start
+        )
+
+        # Collapse entries onto unique word pairs; pair_index maps each entry to its pair
+        hindi_vocab_size = len(corpus.hindi_vocab)
+        pair_keys = english_ids[entry_english] * hindi_vocab_size + hindi_ids[entry_hindi]
+        unique_keys, pair_index = np.unique(pair_keys, return_inverse=True)
+        pair_english = unique_keys // hindi_vocab_size
+        pair_hindi = unique_keys % hindi_vocab_size
+
+        probabilities = np.full(len(unique_keys), 1.0 / hindi_vocab_size)
+        for _ in range(iterations):
+            entry_probabilities = probabilities[pair_index]
+            # E-step: distribute each Hindi token over the English words of its sentence
+            normalizer = np.bincount(entry_hindi, weights=entry_probabilities, minlength=len(hindi_ids))
+            expected = entry_probabilities / normalizer[entry_hindi]
+            # M-step: renormalise expected counts per English word
+            counts = np.bincount(pair_index, weights=expected, minlength=len(unique_keys))
+            totals = np.bincount(pair_english, weights=counts, minlength=len(corpus.english_vocab))
+            probabilities = counts / totals[pair_english]
+
+        self.pair_english, self.pair_hindi, self.pair_index = pair_english, pair_hindi, pair_index
+        self.entry_english, self.entry_hindi = entry_english, entry_hindi
+        self.probabilities = probabilities
+
+    def best_translations(self, min_probability=0.1, min_ratio=1.2):
+        """Return the most probable Hindi word for each English word
+
+        Words whose best translation probability is below min_probability are
+        left out so the translator falls back to the English word. So are words
+        whose best translation is not at least min_ratio times as probable as
+        the runner-up: with only a few sentences (a small incremental batch) EM
+        cannot tell a sentence's Hindi words apart, and every English word would
+        otherwise get the sentence's first Hindi word.
+        """
+        if not len(self.probabilities):
+            return {}
+
+        # Pairs come out of np.unique grouped by English id
+        probabilities = self.probabilities
+        pair_english = self.pair_english
+        group_starts = np.flatnonzero(np.r_[True, pair_english[1:] != pair_english[:-1]])
+        best = first_max_per_group(probabilities, group_starts)
+        others = probabilities.copy()
+        others[best] = 0.0
+        runner_up = np.maximum.reduceat(others, group_starts)
+
+        keep = (
+            (pair_english[best] != NULL_ID)
+            & (probabilities[best] >= min_probability)
+            & (probabilities[best] >= min_ratio * runner_up)
+        )
+        best = best[keep]
+
+        english_words = self.corpus.english_words()
+        hindi_words = self.corpus.hindi_words()
+        return dict(zip(english_words[pair_english[best]], hindi_words[self.pair_hindi[best]]))
+
+    def viterbi_alignment(self):
+        """English position (0 = NULL, 1 = first token) most probably aligned to each Hindi token"""
+        if not len(self.probabilities):
+            return np.zeros(0, dtype=np.int64)
+
+        # Entries are grouped by Hindi token, so each group holds one token's candidate links
+        entry_hindi = self.entry_hindi
+        group_starts = np.flatnonzero(np.r_[True, entry_hindi[1:] != entry_hindi[:-1]])
+        best = first_max_per_group(self.probabilities[self.pair_index], group_starts)
+
+        corpus = self.corpus
+        hindi_sentence = np.repeat(np.arange(len(corpus)), corpus.hindi_lengths)
+        return self.entry_english[best] - corpus.english_starts[hindi_sentence]
@@ -1,5 +1,4 @@
 import streamlit as st
-import requests
 
 # Set page configuration
 st.set_page_config(
@@ -25,6 +24,23 @@ query = st.text_area("Enter English text:", height=150,
 # API URL (with option to change if needed)
 with st.expander("Advanced Settings"):
     api_url = st.text_input("API URL", value="http://localhost:8000")
+    stream_output = st.checkbox("Show translation progressively", value=True,
+                                help="Stream long documents paragraph by paragraph")
+
+# One pooled client per API URL, kept across Streamlit reruns so connections are reused.
+# The client (and httpx) is imported on the first request, so the page renders without it
+@st.cache_resource
+def get_client(url):
+    from translator_client import TranslatorClient
+    return TranslatorClient(base_url=url)
+
+def describe_error(error):
+    from translator_client import TranslatorError
+    if not isinstance(error, TranslatorError):
+        return f"Error: {str(error)}"
+    if error.status_code is None:
+        return "Connection error: Could not connect to the API. Make sure the API server is running."
+    return str(error)
 
 # Translation function
 def get_translation(text, url="http://localhost:8000"):
@@ -32,57 +48,98 @@ def get_translation(text, url="http://localhost:8000"):
         return None, "Please enter some text to translate."
     
     try:
-        response = requests.post(
-            f"{url}/translate",
-            json={"text": text, "preserve_formatting": True}
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("success"):
-                return data.get("translation"), None
-            else:
-                return None, f"Translation error: {data.get('error', 'Unknown error')}"
-        else:
-            return None, f"API returned status code: {response.status_code}"
+        return get_client(url).translate(text), None
+    except Exception as e:
+        return None, describe_error(e)
+
+# Streaming translation: yields (translation so far, error) as paragraphs arrive
+def stream_translation(text, url="http://localhost:8000"):
+    if not text.strip():
+        yield None, "Please enter some text to translate."
+        return
+    
+    try:
+        translation = ""
+        separator = ""
+        for piece in get_client(url).stream_translation(text.strip()):
+            if piece.get("done"):
+                if piece.get("error"):
+                    yield None, f"Translation error: {piece['error']}"
+                return
+            translation += separator + piece["translation"]
+            separator = "\n\n" if piece["end_of_paragraph"] else ". "
+            yield translation, None
     
-    except requests.exceptions.ConnectionError:
-        return None, "Connection error: Could not connect to the API. Make sure the API server is running."
     except Exception as e:
-        return None, f"Error: {str(e)}"
+        yield None, describe_error(e)
+
+def render_translation(placeholder, translation):
+    placeholder.markdown(
+        f"""<div style="background-color: #f0f7fa; padding: 16px; border-radius: 10px; 
+        border-left: 5px solid #2e7d32; color: #333333; font-weight: 500; font-size: 16px;">
+        {translation}
+        </div>""", 
+        unsafe_allow_html=True
+    )
 
 # Translate button
 if st.button("Translate", type="primary", use_container_width=True):
     if not query:
         st.warning("Please enter some text to translate.")
     else:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("English")
+            st.info(query)
+        
+        with col2:
+            st.subheader("Hindi")
+            hindi_placeholder = st.empty()
+        
+        translation, error = None, None
         with st.spinner('Translating...'):
-            translation, error = get_translation(query, api_url)
-            
-            if error:
-                st.error(error)
+            if stream_output:
+                # Render each paragraph as soon as the API sends it
+                for translation, error in stream_translation(query, api_url):
+                    if error:
+                        break
+                    render_translation(hindi_placeholder, translation)
             else:
-                # Show results in a nice card
-                st.success("Translation completed!")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.subheader("English")
-                    st.info(query)
-                
-                with col2:
-                    st.subheader("Hindi")
-                    st.markdown(
-                        f"""<div style="background-color: #f0f7fa; padding: 16px; border-radius: 10px; 
-                        border-left: 5px solid #2e7d32; color: #333333; font-weight: 500; font-size: 16px;">
-                        {translation}
-                        </div>""", 
-                        unsafe_allow_html=True
-                    )
-                
-                # Copy option
-                st.text_area("Copy translation:", value=translation, height=100)
+                translation, error = get_translation(query, api_url)
+        
+        if error:
+            st.error(error)
+        elif translation:
+            render_translation(hindi_placeholder, translation)
+            st.success("Translation completed!")
+            
+            # Copy option
+            st.text_area("Copy translation:", value=translation, height=100)
+
+# Whole-file translation: the API translates the file as a background job
+st.markdown("---")
+st.markdown("### Translate a File")
+uploaded_file = st.file_uploader("Upload a .txt, .csv or .docx file", type=["txt", "csv", "docx"])
+
+def translate_file(file, url="http://localhost:8000", progress=None):
+    """Translate an uploaded file through a file job; returns (translated bytes, filename, error)"""
+    try:
+        on_progress = (lambda percent: progress.progress(min(1.0, percent / 100))) if progress else None
+        content, filename = get_client(url).translate_file(file.getvalue(), file.name, on_progress=on_progress)
+        return content, filename, None
+    except Exception as e:
+        return None, None, describe_error(e)
+
+if uploaded_file is not None and st.button("Translate File", use_container_width=True):
+    progress_bar = st.progress(0.0)
+    content, filename, error = translate_file(uploaded_file, api_url, progress_bar)
+    if error:
+        st.error(error)
+    else:
+        progress_bar.progress(1.0)
+        st.success("File translated!")
+        st.download_button("Download translation", data=content, file_name=filename)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,328 @@
+"""Benchmarks for the translation and training hot paths.
+
+Generates synthetic English/Hindi corpora at several scales, times each stage of
+the pipeline (phrase extraction, translation of short and long documents,
+training, persistence and model loading) and runs an in-process load test of
+the FastAPI app with mixed /translate and /train/add-data traffic.
+
+Results are written as JSON so runs can be compared between commits:
+
+    python benchmark.py --scales 1000,10000 --output results/before.json
+    python benchmark.py --scales 1000,10000 --compare results/before.json
+
+The benchmark uses a temporary model directory and never touches models/.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Synthetic vocabulary building blocks
+ENGLISH_SYLLABLES = ["ad", "min", "is", "tra", "tion", "ap", "pli", "ca", "de", "part", "ment",
+                     "cer", "ti", "fi", "cate", "pro", "vi", "sion", "re", "quest", "of", "fice"]
+HINDI_SYLLABLES = ["क", "का", "कि", "र", "रा", "म", "मा", "न", "ना", "त", "ती", "स", "से",
+                   "प", "पा", "ल", "ला", "द", "दी", "व", "वा", "ग", "ह", "प्र", "श्र", "क्ष"]
+BOILERPLATE = [
+    ("You are requested to submit the documents", "आपसे अनुरोध है कि दस्तावेज जमा करें"),
+    ("This is for your kind information", "यह आपकी सूचना के लिए है"),
+    ("Issued with the approval of the competent authority", "सक्षम प्राधिकारी के अनुमोदन से जारी"),
+    ("Please find the enclosed circular", "कृपया संलग्न परिपत्र देखें"),
+]
+
+
+def make_vocabulary(size, rng):
+    """Return parallel lists of unique synthetic English and Hindi words"""
+    english, hindi = [], []
+    seen_english, seen_hindi = set(), set()
+    while len(english) < size:
+        en = "".join(rng.choice(ENGLISH_SYLLABLES) for _ in range(rng.randint(1, 4)))
+        hi = "".join(rng.choice(HINDI_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if en in seen_english or hi in seen_hindi:
+            continue
+        seen_english.add(en)
+        seen_hindi.add(hi)
+        english.append(en)
+        hindi.append(hi)
+    return english, hindi
+
+
+class CorpusGenerator:
+    """Deterministic generator of synthetic parallel sentences"""
+
+    def __init__(self, vocabulary_size=5000, seed=13):
+        self.rng = random.Random(seed)
+        self.english, self.hindi = make_vocabulary(vocabulary_size, self.rng)
+        # Zipf-like word frequencies, as in real text
+        self.weights = [1.0 / (rank + 1) for rank in range(vocabulary_size)]
+
+    def sentence_pair(self, min_words=6, max_words=20):
+        if self.rng.random() < 0.1:
+            return self.rng.choice(BOILERPLATE)
+        ids = self.rng.choices(range(len(self.english)), weights=self.weights, k=self.rng.randint(min_words, max_words))
+        english = " ".join(self.english[i] for i in ids).capitalize()
+        # Verb-final word order on the Hindi side
+        hindi_ids = ids[1:] + ids[:1]
+        hindi = " ".join(self.hindi[i] for i in hindi_ids)
+        return english, hindi
+
+    def corpus(self, pairs):
+        return [{"english": en + ".", "hindi": hi + "।"} for en, hi in (self.sentence_pair() for _ in range(pairs))]
+
+    def document(self, sentences, paragraph_length=20):
+        paragraphs = []
+        for start in range(0, sentences, paragraph_length):
+            count = min(paragraph_length, sentences - start)
+            paragraphs.append(" ".join(self.sentence_pair()[0] + "." for _ in range(count)))
+        return "\n\n".join(paragraphs)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure_stage(stage, scale, fn, items, units_per_item=1, measure_memory=True):
+    """Time fn over items and return throughput, latency percentiles and peak memory"""
+    latencies = []
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    peak_memory = None
+    if measure_memory:
+        # Separate pass so tracing overhead does not distort the timings
+        tracemalloc.start()
+        fn(items[0])
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    result = {
+        "stage": stage,
+        "scale": scale,
+        "calls": len(items),
+        "seconds": round(elapsed, 6),
+        "throughput_per_s": round(len(items) * units_per_item / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_memory_bytes": peak_memory
+    }
+    print(f"  {stage:<28} {result['throughput_per_s']:>12} /s   p50 {result['p50_ms']:>10} ms   "
+          f"p99 {result['p99_ms']:>10} ms   peak {peak_memory or '-'} B")
+    return result
+
+
+def reset_model(main):
+    """Clear the in-memory model and its on-disk artifacts"""
+    main.publish_model(main.TranslationModel())
+    for path in main.MODEL_DIR.iterdir():
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+    main.training_store.initialized = False
+    main.training_jobs.store_ready = False
+    main.document_jobs.store_ready = False
+
+
+def benchmark_scale(main, scale, args):
+    """Run every pipeline stage against a corpus of `scale` pairs"""
+    from translation_cache import LRUCache
+
+    generator = CorpusGenerator(seed=args.seed)
+    corpus = generator.corpus(scale)
+    sentences = [generator.sentence_pair()[0] for _ in range(args.short_requests)]
+    documents = [generator.document(args.long_sentences) for _ in range(args.long_requests)]
+    main.translation_cache = LRUCache(args.cache_size)
+    reset_model(main)
+
+    print(f"\nScale: {scale} pairs")
+    results = [
+        measure_stage("update_translation_maps", scale,
+                      lambda data: main.update_translation_maps(data, persist=False),
+                      [corpus], units_per_item=scale, measure_memory=args.memory),
+        measure_stage("save_translation_maps", scale, lambda _: main.save_translation_maps(), [None],
+                      measure_memory=args.memory),
+        measure_stage("load_model (compiled)", scale, lambda _: main.load_model(), [None],
+                      measure_memory=args.memory)
+    ]
+
+    def load_from_json(_):
+        # Without a CURRENT snapshot the JSON maps are imported and a snapshot is published
+        main.snapshot_store.pointer_path.unlink(missing_ok=True)
+        main.load_model()
+
+    results.append(measure_stage("load_model (json import)", scale, load_from_json, [None],
+                                 measure_memory=args.memory))
+    results.append(measure_stage("extract_phrases", scale, main.extract_phrases, sentences,
+                                 measure_memory=args.memory))
+    results.append(measure_stage("preprocess_text (long)", scale, main.preprocess_text, documents,
+                                 units_per_item=args.long_sentences, measure_memory=args.memory))
+    results.append(measure_stage("translate (short)", scale, main.translate_text_with_model, sentences,
+                                 measure_memory=args.memory))
+    results.append(measure_stage("translate (long)", scale, main.translate_text_with_model, documents,
+                                 units_per_item=args.long_sentences, measure_memory=args.memory))
+    return results
+
+
+async def load_test(main, args):
+    """Drive the ASGI app in-process with concurrent mixed translate/train traffic"""
+    import httpx
+
+    generator = CorpusGenerator(seed=args.seed + 1)
+    reset_model(main)
+    main.update_translation_maps(generator.corpus(args.load_test_corpus))
+    main.load_model()
+
+    latencies = {"/translate": [], "/train/add-data": []}
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(args.load_test_requests):
+        if generator.rng.random() < args.train_ratio:
+            queue.put_nowait(("/train/add-data", {"training_pairs": generator.corpus(args.train_batch)}))
+        else:
+            text = generator.document(generator.rng.randint(1, 40))
+            queue.put_nowait(("/translate", {"text": text}))
+
+    async def worker(client):
+        nonlocal errors
+        while not queue.empty():
+            path, payload = queue.get_nowait()
+            t0 = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies[path].append(time.perf_counter() - t0)
+            if response.status_code != 200 or not response.json().get("success", False):
+                errors += 1
+
+    transport = httpx.ASGITransport(app=main.app)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    print(f"\nLoad test: {args.load_test_requests} requests, concurrency {args.concurrency}")
+    results = []
+    for path, values in latencies.items():
+        result = {
+            "stage": f"load_test {path}",
+            "scale": args.load_test_corpus,
+            "calls": len(values),
+            "seconds": round(elapsed, 6),
+            "throughput_per_s": round(len(values) / elapsed, 2) if elapsed else None,
+            "p50_ms": round(percentile(values, 0.5) * 1000, 4),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+            "peak_memory_bytes": None,
+            "errors": errors
+        }
+        print(f"  {path:<28} {result['throughput_per_s']:>12} /s   p50 {result['p50_ms']:>10} ms   "
+              f"p99 {result['p99_ms']:>10} ms")
+        results.append(result)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print throughput and p99 changes relative to a previous results file"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    baseline = {(r["stage"], r["scale"]): r for r in report["results"]}
+
+    print(f"\nComparison with {baseline_path} (commit {report['meta'].get('commit')})")
+    for result in results:
+        before = baseline.get((result["stage"], result["scale"]))
+        if not before or not before["throughput_per_s"] or not result["throughput_per_s"]:
+            continue
+        speedup = result["throughput_per_s"] / before["throughput_per_s"]
+        print(f"  {result['stage']:<28} scale {result['scale']:>7}   throughput x{speedup:.2f}   "
+              f"p99 {before['p99_ms']} -> {result['p99_ms']} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", default="1000,10000",
+                        help="Comma-separated corpus sizes in pairs (e.g. 1000,10000,100000)")
+    parser.add_argument("--short-requests", type=int, default=2000, help="Single-sentence translations per scale")
+    parser.add_argument("--long-requests", type=int, default=20, help="Long-document translations per scale")
+    parser.add_argument("--long-sentences", type=int, default=200, help="Sentences per long document")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Translation cache size during the benchmark (0 measures the uncached pipeline)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip peak memory measurement")
+    parser.add_argument("--skip-load-test", action="store_true")
+    parser.add_argument("--load-test-requests", type=int, default=500)
+    parser.add_argument("--load-test-corpus", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--train-ratio", type=float, default=0.1, help="Share of load-test requests that add training data")
+    parser.add_argument("--train-batch", type=int, default=10, help="Pairs per /train/add-data request")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="Results file (default: benchmark_results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+    commit = git_commit()
+
+    model_dir = tempfile.mkdtemp(prefix="translator-benchmark-")
+    os.environ["TRANSLATOR_MODEL_DIR"] = model_dir
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    try:
+        import main as api
+
+        results = []
+        for scale in scales:
+            results.extend(benchmark_scale(api, scale, args))
+        if not args.skip_load_test:
+            results.extend(asyncio.run(load_test(api, args)))
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "arguments": vars(args)
+        },
+        "results": results
+    }
+
+    output = Path(args.output) if args.output else (
+        Path("benchmark_results") / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'nocommit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
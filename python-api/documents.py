@@ -0,0 +1,279 @@
+"""Readers and writers for translating whole files (.txt, .csv, .docx).
+
+Each format reads its source as a stream of records. A record holds the texts
+to translate (a paragraph, the cells of a CSV row, a Word paragraph) and
+whatever is needed to write it back. ``write`` receives the record with its
+translations, in source order, so the output keeps the original structure.
+Records are produced lazily, so a caller that translates a bounded window of
+records at a time keeps memory bounded for text and CSV files; a .docx is
+rewritten one XML part at a time.
+"""
+
+import csv
+import html
+import io
+import re
+import shutil
+import zipfile
+from xml.sax.saxutils import escape
+
+FORMATS = ("txt", "csv", "docx")
+
+MEDIA_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+}
+
+
+def detect_format(filename=None, content_type=None):
+    """Guess the file format from a file name or Content-Type header, or None"""
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+        if extension in FORMATS:
+            return extension
+    content_type = (content_type or "").lower()
+    if "wordprocessingml" in content_type:
+        return "docx"
+    if "csv" in content_type:
+        return "csv"
+    if content_type.startswith("text/plain"):
+        return "txt"
+    return None
+
+
+def _has_letters(text):
+    return any(character.isalpha() for character in text)
+
+
+def _size(source):
+    """Size in bytes of a seekable binary file, leaving it positioned at the start"""
+    size = source.seek(0, io.SEEK_END)
+    source.seek(0)
+    return size
+
+
+class TextDocument:
+    """Plain text; each paragraph (lines up to a blank line) is one record
+
+    Blank lines and line endings between paragraphs are copied unchanged. A
+    paragraph longer than max_unit_chars is cut at a line boundary so a file
+    without blank lines is never buffered whole.
+    """
+
+    def __init__(self, source, output, max_unit_chars=20000):
+        self.raw = source
+        self.size = _size(source)
+        self.source = io.TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline="")
+        self.output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        self.max_unit_chars = max_unit_chars
+
+    def records(self):
+        lines = []
+        size = 0
+        for line in self.source:
+            if not line.strip():
+                if lines:
+                    yield self._record(lines)
+                    lines, size = [], 0
+                yield [], line
+                continue
+            lines.append(line)
+            size += len(line)
+            if size >= self.max_unit_chars:
+                yield self._record(lines)
+                lines, size = [], 0
+        if lines:
+            yield self._record(lines)
+
+    @staticmethod
+    def _record(lines):
+        """(texts, context) for a paragraph; the context is the line ending after it"""
+        paragraph = "".join(lines)
+        body = paragraph.rstrip("\r\n")
+        return [body.strip()], paragraph[len(body):]
+
+    def progress(self):
+        """Fraction of the source read so far"""
+        return min(1.0, self.raw.tell() / self.size) if self.size else 1.0
+
+    def write(self, record, translations):
+        texts, line_ending = record
+        if texts:
+            self.output.write(translations[0])
+        self.output.write(line_ending)
+
+    def finish(self):
+        self.output.flush()
+        self.output.detach()
+
+
+class CsvDocument:
+    """CSV; each row is one record and its cells with letters are translated
+
+    With header set, the first row is copied unchanged and columns may name
+    header fields. Otherwise columns are 0-based indexes. Without columns every
+    cell that contains letters is translated.
+    """
+
+    def __init__(self, source, output, columns=None, header=True):
+        self.raw = source
+        self.size = _size(source)
+        self.reader = csv.reader(io.TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline=""))
+        self.output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        self.writer = csv.writer(self.output)
+        self.columns = columns
+        self.header = header
+
+    def records(self):
+        selected = None
+        for number, row in enumerate(self.reader):
+            if number == 0 and self.header:
+                if self.columns:
+                    missing = [column for column in self.columns if column not in row]
+                    if missing:
+                        raise ValueError(f"Unknown CSV columns: {', '.join(missing)}")
+                    selected = {row.index(column) for column in self.columns}
+                yield [], (row, [])
+                continue
+            if selected is None and self.columns:
+                selected = {int(column) for column in self.columns}
+            positions = [
+                position for position, cell in enumerate(row)
+                if (selected is None or position in selected) and _has_letters(cell)
+            ]
+            yield [row[position].strip() for position in positions], (row, positions)
+
+    progress = TextDocument.progress
+
+    def write(self, record, translations):
+        _, (row, positions) = record
+        row = list(row)
+        for position, translation in zip(positions, translations):
+            row[position] = translation
+        self.writer.writerow(row)
+
+    def finish(self):
+        self.output.flush()
+        self.output.detach()
+
+
+# Paragraph and text-run tags of WordprocessingML (w:pPr, w:tab, w:tbl... are not matched)
+_DOCX_TAG = re.compile(r"<(/?)w:(p|t)(?=[\s/>])[^>]*?(/?)>")
+# Parts that hold translatable paragraphs
+_DOCX_PARTS = re.compile(r"word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$")
+
+
+class _DocxPart:
+    """One XML part being rewritten; written out once all its paragraphs are translated"""
+
+    def __init__(self, info, xml):
+        self.info = info
+        self.xml = xml
+        self.replacements = []
+        self.pending = 0
+        self.exhausted = False
+
+
+class DocxDocument:
+    """Word .docx; each paragraph with text is one record
+
+    The translation replaces the paragraph's first text run and the other runs
+    are emptied. Paragraph and table formatting is kept, but formatting that
+    changes within a paragraph (bold words, links) is not. Every other part of
+    the package is copied unchanged.
+    """
+
+    def __init__(self, source, output):
+        self.package = zipfile.ZipFile(source)
+        self.output = zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED)
+        self.parts = [info for info in self.package.infolist() if _DOCX_PARTS.match(info.filename)]
+        self.parts_read = 0.0
+
+    def records(self):
+        for info in self.package.infolist():
+            if info not in self.parts:
+                with self.package.open(info) as part, self.output.open(info, "w") as copy:
+                    shutil.copyfileobj(part, copy, 1024 * 1024)
+
+        for number, info in enumerate(self.parts):
+            part = _DocxPart(info, self.package.read(info).decode("utf-8"))
+            paragraphs = self._paragraphs(part.xml)
+            for index, runs in enumerate(paragraphs):
+                self.parts_read = number + index / len(paragraphs)
+                text = "".join(html.unescape(content) for _, _, content in runs)
+                if _has_letters(text):
+                    part.pending += 1
+                    yield [text.strip()], (part, runs)
+            self.parts_read = number + 1
+            part.exhausted = True
+            if not part.pending:
+                self._write_part(part)
+
+    @staticmethod
+    def _paragraphs(xml):
+        """Lists of (start, end, content) text runs, one list per paragraph, in document order"""
+        open_paragraphs = []
+        paragraphs = []
+        run_start = None
+        for match in _DOCX_TAG.finditer(xml):
+            closing, tag, self_closing = match.group(1), match.group(2), match.group(3)
+            if tag == "p":
+                if self_closing:
+                    continue
+                if not closing:
+                    open_paragraphs.append([])
+                    # Reserve the slot now so nested paragraphs come after their parent
+                    paragraphs.append(open_paragraphs[-1])
+                elif open_paragraphs:
+                    open_paragraphs.pop()
+            elif not open_paragraphs:
+                continue
+            elif self_closing:
+                open_paragraphs[-1].append((match.start(), match.end(), ""))
+            elif not closing:
+                run_start = match
+            elif run_start is not None:
+                open_paragraphs[-1].append((run_start.start(), match.end(), xml[run_start.end():match.start()]))
+                run_start = None
+        return [runs for runs in paragraphs if runs]
+
+    def progress(self):
+        """Fraction of the translatable parts read so far"""
+        return self.parts_read / len(self.parts) if self.parts else 1.0
+
+    def write(self, record, translations):
+        _, (part, runs) = record
+        first_start, first_end, _ = runs[0]
+        part.replacements.append((first_start, first_end, f'<w:t xml:space="preserve">{escape(translations[0])}</w:t>'))
+        part.replacements.extend((start, end, "<w:t/>") for start, end, _ in runs[1:])
+        part.pending -= 1
+        if part.exhausted and not part.pending:
+            self._write_part(part)
+
+    def _write_part(self, part):
+        """Write a part with every translated run replaced"""
+        pieces = []
+        position = 0
+        for start, end, replacement in sorted(part.replacements):
+            pieces.append(part.xml[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(part.xml[position:])
+        self.output.writestr(part.info, "".join(pieces).encode("utf-8"))
+        part.xml = None
+
+    def finish(self):
+        self.output.close()
+        self.package.close()
+
+
+def open_document(file_format, source, output, columns=None, header=True, max_unit_chars=20000):
+    """Return the reader/writer for file_format over binary files source and output"""
+    if file_format == "txt":
+        return TextDocument(source, output, max_unit_chars=max_unit_chars)
+    if file_format == "csv":
+        return CsvDocument(source, output, columns=columns, header=header)
+    if file_format == "docx":
+        return DocxDocument(source, output)
+    raise ValueError(f"Unsupported file format: {file_format}")
@@ -0,0 +1,354 @@
+"""Offline evaluation of translation quality against speed and memory.
+
+Splits a parallel corpus into a training set and a held-out set and trains a
+model on the training set. The held-out English is then translated with each
+engine, and each engine's output is scored against the held-out Hindi with
+corpus BLEU and chrF. Translation runs on a process pool, so every core is
+used. Each worker memory-maps the trained snapshot, the way API workers do.
+
+Engines are functions in ENGINES. Each is one way of turning English into
+Hindi with a trained model: the served pipeline, the pipeline without its
+translation memory, the phrase matcher alone, or word by word. Training
+configurations such as phrase table pruning thresholds are swept with
+--phrase-min-count/--phrase-max-length. Each configuration is trained once and
+evaluated with every engine, and the result is one table to choose a
+deployment configuration from:
+
+    python evaluate.py --corpus govt_training_data.csv
+    python evaluate.py --corpus big.jsonl --phrase-min-count 2,3,5 --max-holdout 5000
+
+The corpus is a CSV file with english,hindi columns, a JSONL file of
+{"english", "hindi"} objects or a training_data.db store. The evaluation uses
+a temporary model directory and never touches models/.
+"""
+
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import csv
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from benchmark import git_commit, percentile, reset_model
+from tokenizer import tokenize_hindi
+
+# Set in each worker process by _init_worker
+api = None
+memoryless_model = None
+
+
+def engine_pipeline(text):
+    """The served path: exact entries, translation memory, then the phrase matcher"""
+    return api.translate_text_with_model(text)
+
+
+def engine_no_memory(text):
+    """The served path without the translation memory"""
+    return "\n\n".join(api.translate_paragraph(paragraph, memoryless_model) for paragraph in api.iter_preprocessed(text))
+
+
+def engine_phrase_matcher(text):
+    """Longest-match phrases and word lookups only; what a sentence gets with no exact entry"""
+    model = api.active_model
+    return "\n\n".join(
+        ". ".join(" ".join(model.matcher.translate_tokens(sentence.tokens, model.word_map)) for sentence in paragraph)
+        for paragraph in api.iter_preprocessed(text)
+    )
+
+
+def engine_word_by_word(text):
+    """Baseline: every token from the word map"""
+    word_map = api.active_model.word_map
+    return "\n\n".join(
+        ". ".join(" ".join(word_map.get(token, token) for token in sentence.tokens) for sentence in paragraph)
+        for paragraph in api.iter_preprocessed(text)
+    )
+
+
+ENGINES = {
+    "pipeline": engine_pipeline,
+    "no-memory": engine_no_memory,
+    "phrase-matcher": engine_phrase_matcher,
+    "word-by-word": engine_word_by_word
+}
+
+
+def read_corpus(path):
+    """Load {english, hindi} pairs from a CSV, JSONL or training_data.db file"""
+    from training_store import TrainingStore, clean_pairs
+
+    path = Path(path)
+    if path.suffix == ".db":
+        return clean_pairs(TrainingStore(path).iter_pairs())
+    with open(path, 'r', encoding='utf-8-sig', newline="") as f:
+        if path.suffix == ".csv":
+            return clean_pairs(
+                {"english": row.get("english") or "", "hindi": row.get("hindi") or ""} for row in csv.DictReader(f)
+            )
+        return clean_pairs(json.loads(line) for line in f if line.strip())
+
+
+def split_holdout(pairs, fraction, max_holdout, seed):
+    """Shuffle pairs into (training, held out); training drops pairs whose English is held out"""
+    pairs = list(pairs)
+    random.Random(seed).shuffle(pairs)
+    size = max(1, int(len(pairs) * fraction))
+    if max_holdout:
+        size = min(size, max_holdout)
+    holdout, training = pairs[:size], pairs[size:]
+    # A held-out sentence that is also in the training set would only test the exact lookup
+    held_out = {pair["english"].lower() for pair in holdout}
+    return [pair for pair in training if pair["english"].lower() not in held_out], holdout
+
+
+def _ngrams(items, n):
+    return Counter(tuple(items[i:i + n]) for i in range(len(items) - n + 1))
+
+
+def corpus_bleu(hypotheses, references, max_order=4):
+    """Corpus BLEU (0-100) over Hindi word tokens, with the standard brevity penalty"""
+    matches = [0] * max_order
+    totals = [0] * max_order
+    hypothesis_length = reference_length = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hypothesis, reference = tokenize_hindi(hypothesis), tokenize_hindi(reference)
+        hypothesis_length += len(hypothesis)
+        reference_length += len(reference)
+        for n in range(1, max_order + 1):
+            hypothesis_ngrams = _ngrams(hypothesis, n)
+            matches[n - 1] += sum((hypothesis_ngrams & _ngrams(reference, n)).values())
+            totals[n - 1] += max(0, len(hypothesis) - n + 1)
+    if not hypothesis_length or min(matches) == 0:
+        return 0.0
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_order
+    brevity = 1.0 if hypothesis_length > reference_length else math.exp(1 - reference_length / hypothesis_length)
+    return 100 * brevity * math.exp(log_precision)
+
+
+def corpus_chrf(hypotheses, references, max_order=6, beta=2):
+    """Corpus chrF (0-100): character n-gram F-score with recall weighted by beta, ignoring whitespace"""
+    matches = [0] * max_order
+    hypothesis_totals = [0] * max_order
+    reference_totals = [0] * max_order
+    for hypothesis, reference in zip(hypotheses, references):
+        hypothesis, reference = "".join(hypothesis.split()), "".join(reference.split())
+        for n in range(1, max_order + 1):
+            hypothesis_ngrams, reference_ngrams = _ngrams(hypothesis, n), _ngrams(reference, n)
+            matches[n - 1] += sum((hypothesis_ngrams & reference_ngrams).values())
+            hypothesis_totals[n - 1] += sum(hypothesis_ngrams.values())
+            reference_totals[n - 1] += sum(reference_ngrams.values())
+    orders = [n for n in range(max_order) if hypothesis_totals[n] and reference_totals[n]]
+    if not orders:
+        return 0.0
+    precision = sum(matches[n] / hypothesis_totals[n] for n in orders) / len(orders)
+    recall = sum(matches[n] / reference_totals[n] for n in orders) / len(orders)
+    if not precision + recall:
+        return 0.0
+    return 100 * (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall)
+
+
+def _peak_rss_bytes():
+    """Peak resident memory of this process, or None where the platform cannot tell"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _init_worker(model_dir, path):
+    """Load the trained snapshot in a worker process"""
+    global api, memoryless_model
+    os.environ["TRANSLATOR_MODEL_DIR"] = model_dir
+    sys.path.insert(0, path)
+    import main
+    from translation_cache import LRUCache
+
+    api = main
+    # Every engine is measured uncached, and they must not share cached sentences
+    api.translation_cache = LRUCache(0)
+    api.load_model()
+    while api.active_model.memory is not None and not api.active_model.memory.ready:
+        time.sleep(0.01)
+    memoryless_model = copy.copy(api.active_model)
+    memoryless_model.memory = None
+
+
+def _translate_shard(engine, texts):
+    """Translate texts with one engine; returns (translations, per-text seconds, peak RSS)"""
+    translate = ENGINES[engine]
+    translations, latencies = [], []
+    for text in texts:
+        started = time.perf_counter()
+        translations.append(translate(text))
+        latencies.append(time.perf_counter() - started)
+    return translations, latencies, _peak_rss_bytes()
+
+
+def evaluate_configuration(main, config, training, holdout, args):
+    """Train one configuration, then translate and score the held-out set with every engine"""
+    reset_model(main)
+    main.PHRASE_MIN_COUNT = config["phrase_min_count"]
+    main.PHRASE_MAX_LENGTH = config["phrase_max_length"]
+    model = main.TranslationModel()
+    started = time.perf_counter()
+    main.update_translation_maps(training, model=model, persist=False)
+    training_seconds = time.perf_counter() - started
+    # Workers memory-map the snapshot instead of training again
+    main.save_translation_maps(model)
+
+    label = f"min_count={config['phrase_min_count']} max_length={config['phrase_max_length']}"
+    print(f"\n{label}: trained on {len(training)} pairs in {training_seconds:.2f}s "
+          f"({len(model.word_map)} words, {len(model.phrase_map)} phrases)")
+
+    sources = [pair["english"] for pair in holdout]
+    references = [pair["hindi"] for pair in holdout]
+    shards = [sources[i:i + args.shard_size] for i in range(0, len(sources), args.shard_size)]
+    results = []
+    # Fresh interpreters that import the API and load the snapshot, like API workers
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(main.MODEL_DIR), str(Path(__file__).resolve().parent))
+    ) as pool:
+        # Keep every worker busy once so all of them start and load the model before timing
+        list(pool.map(time.sleep, [0.2] * args.workers))
+
+        for engine in args.engines:
+            started = time.perf_counter()
+            outputs = list(pool.map(_translate_shard, itertools.repeat(engine), shards))
+            elapsed = time.perf_counter() - started
+
+            hypotheses = [translation for translations, _, _ in outputs for translation in translations]
+            latencies = [latency for _, shard_latencies, _ in outputs for latency in shard_latencies]
+            rss = [peak for _, _, peak in outputs if peak is not None]
+            result = {
+                "config": label,
+                **config,
+                "engine": engine,
+                "sentences": len(sources),
+                "bleu": round(corpus_bleu(hypotheses, references), 2),
+                "chrf": round(corpus_chrf(hypotheses, references), 2),
+                "throughput_per_s": round(len(sources) / elapsed, 2) if elapsed else None,
+                "p50_ms": round(percentile(latencies, 0.5) * 1000, 4),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+                "worker_peak_rss_bytes": max(rss) if rss else None,
+                "word_map_size": len(model.word_map),
+                "phrase_map_size": len(model.phrase_map),
+                "training_seconds": round(training_seconds, 3)
+            }
+            results.append(result)
+            if args.samples:
+                for source, hypothesis, reference in list(zip(sources, hypotheses, references))[:args.samples]:
+                    print(f"    [{engine}] {source}\n      -> {hypothesis}\n      == {reference}")
+    return results
+
+
+def print_table(results):
+    """Print the results as one quality/speed/memory table"""
+    header = (f"{'config':<28} {'engine':<15} {'BLEU':>6} {'chrF':>6} {'sent/s':>10} "
+              f"{'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>8} {'phrases':>9}")
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        rss = f"{r['worker_peak_rss_bytes'] / 2 ** 20:.0f}" if r["worker_peak_rss_bytes"] else "-"
+        print(f"{r['config']:<28} {r['engine']:<15} {r['bleu']:>6} {r['chrf']:>6} {r['throughput_per_s']:>10} "
+              f"{r['p50_ms']:>9} {r['p99_ms']:>9} {rss:>8} {r['phrase_map_size']:>9}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", default="govt_training_data.csv",
+                        help="CSV (english,hindi), JSONL or training_data.db corpus")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction of pairs held out for scoring")
+    parser.add_argument("--max-holdout", type=int, default=2000, help="Upper bound on held-out pairs (0: no bound)")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help=f"Comma-separated engines to compare ({', '.join(ENGINES)})")
+    parser.add_argument("--phrase-min-count", default=None,
+                        help="Comma-separated phrase table min counts to train with (default: the API setting)")
+    parser.add_argument("--phrase-max-length", default=None,
+                        help="Comma-separated maximum phrase lengths to train with (default: the API setting)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Translation processes")
+    parser.add_argument("--shard-size", type=int, default=64, help="Held-out sentences per worker task")
+    parser.add_argument("--samples", type=int, default=0, help="Print this many translations per engine")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="Results file (default: evaluation_results/<timestamp>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    args.engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    unknown = [engine for engine in args.engines if engine not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    commit = git_commit()
+    pairs = read_corpus(args.corpus)
+    training, holdout = split_holdout(pairs, args.holdout, args.max_holdout, args.seed)
+    print(f"Corpus {args.corpus}: {len(pairs)} pairs, {len(training)} for training, {len(holdout)} held out")
+
+    model_dir = tempfile.mkdtemp(prefix="translator-evaluation-")
+    os.environ["TRANSLATOR_MODEL_DIR"] = model_dir
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    try:
+        import main as api_module
+
+        def values(option, default):
+            return [int(value) for value in option.split(",")] if option else [default]
+
+        configs = [
+            {"phrase_min_count": min_count, "phrase_max_length": max_length}
+            for min_count in values(args.phrase_min_count, api_module.PHRASE_MIN_COUNT)
+            for max_length in values(args.phrase_max_length, api_module.PHRASE_MAX_LENGTH)
+        ]
+        results = []
+        for config in configs:
+            results.extend(evaluate_configuration(api_module, config, training, holdout, args))
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+
+    print_table(results)
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "corpus": str(args.corpus),
+            "pairs": len(pairs),
+            "training_pairs": len(training),
+            "holdout_pairs": len(holdout),
+            "cpu_count": os.cpu_count(),
+            "arguments": vars(args)
+        },
+        "results": results
+    }
+    output = Path(args.output) if args.output else (
+        Path("evaluation_results") / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'nocommit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
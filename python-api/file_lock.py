@@ -0,0 +1,58 @@
+"""Cross-process exclusive lock on a file.
+
+Used to make one API worker at a time the writer of the shared model files.
+The lock is an ``flock`` on a lock file, so the kernel releases it if the
+holding process dies. It is reentrant within a thread, and threads of the same
+process also exclude each other. Without ``fcntl`` (Windows) it only
+excludes threads of one process.
+"""
+
+from pathlib import Path
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class FileLock:
+    """Reentrant lock held across processes through flock on path"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.local = threading.RLock()
+        self.depth = 0
+        self.handle = None
+
+    def acquire(self, blocking=True):
+        """Take the lock; with blocking=False return False instead of waiting"""
+        if not self.local.acquire(blocking=blocking):
+            return False
+        if self.depth == 0 and fcntl is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(self.path, "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                self.local.release()
+                return False
+            self.handle = handle
+        self.depth += 1
+        return True
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0 and self.handle is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+            self.handle.close()
+            self.handle = None
+        self.local.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
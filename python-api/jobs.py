@@ -0,0 +1,167 @@
+"""Background job registry for work that must not run on the asyncio event loop.
+
+Jobs run on a dedicated thread pool and record their status so clients can poll
+for completion through the API. With a store path, status records are also
+written to a SQLite file, so with several API worker processes any worker can
+report a job that another worker runs. Those writes happen on a writer thread of
+their own, never under the registry lock or on the caller's thread: submit() and
+report() are called from the event loop and from every document chunk, and a
+busy store file must not stall them.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class JobRegistry:
+    """Run callables on a bounded executor and keep a status record for each one"""
+
+    def __init__(self, max_workers=1, max_history=200, name="job", store_path=None, store_ttl=24 * 3600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.max_history = max_history
+        self.jobs = OrderedDict()
+        self.futures = {}
+        self.lock = threading.Lock()
+        # Shared status records are dropped store_ttl seconds after their last update
+        self.store_path = Path(store_path) if store_path else None
+        self.store_ttl = store_ttl
+        # The store is created on first use, so constructing a registry touches no files
+        self.store_ready = False
+        # Job id -> (record JSON, updated_at) not yet written; repeated updates of a job
+        # between two flushes are written once
+        self.unwritten = {}
+        self.store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-store")
+
+    def _connect(self):
+        if not self.store_ready:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.store_path, timeout=30)
+        if not self.store_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, "
+                "record TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self.store_ready = True
+        return conn
+
+    def _store(self, job):
+        """Queue a job record for the shared store (caller holds the lock)"""
+        if self.store_path is None:
+            return
+        if not self.unwritten:
+            self.store_executor.submit(self._flush)
+        self.unwritten[job["job_id"]] = (json.dumps(job, ensure_ascii=False, default=str), time.time())
+
+    def _flush(self):
+        """Write the queued records and drop expired ones (runs on the store thread)"""
+        with self.lock:
+            records, self.unwritten = self.unwritten, {}
+        if not records:
+            return
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO jobs (job_id, record, updated_at) VALUES (?, ?, ?)",
+                [(job_id, record, updated_at) for job_id, (record, updated_at) in records.items()]
+            )
+            conn.execute("DELETE FROM jobs WHERE updated_at < ?", (time.time() - self.store_ttl,))
+            conn.commit()
+
+    def submit(self, kind, fn, *args, job_id=None, **kwargs):
+        """Queue fn(*args, **kwargs) and return the job id (a new one unless job_id is given)"""
+        job_id = job_id or self.new_id()
+        with self.lock:
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "result": None,
+                "error": None,
+                "progress": None,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None
+            }
+            self._prune()
+            self._store(self.jobs[job_id])
+
+        self.futures[job_id] = self.executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        self._update(job_id, status="running", started_at=time.time())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            self._update(job_id, status="failed", error=detail, finished_at=time.time())
+            raise
+        self._update(job_id, status="completed", result=result, finished_at=time.time())
+        return result
+
+    @staticmethod
+    def new_id():
+        """A fresh job id, for callers that need it before submitting"""
+        return uuid.uuid4().hex
+
+    def report(self, job_id, **progress):
+        """Record progress fields of a running job; they appear in its status"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                # Replaced, not mutated, so copies handed out by get() stay consistent
+                job["progress"] = {**(job["progress"] or {}), **progress}
+                self._store(job)
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(fields)
+                self._store(self.jobs[job_id])
+
+    def _prune(self):
+        """Drop the oldest finished jobs once the history limit is reached"""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("completed", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_history)]:
+            del self.jobs[job_id]
+            self.futures.pop(job_id, None)
+
+    def get(self, job_id):
+        """Return a copy of the job status, or None if the job is unknown
+
+        A job of another worker is read from the store, so call this off the event loop.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return dict(job)
+        if self.store_path is None:
+            return None
+        # Submitted to another worker process
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def pending(self):
+        """Number of jobs that are queued or running"""
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def future(self, job_id):
+        """Return the concurrent.futures.Future backing a job"""
+        return self.futures[job_id]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        # Queued status writes are small; let them finish
+        self.store_executor.shutdown(wait=True)
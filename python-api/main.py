@@ -1,10 +1,36 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, List, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import codecs
+import csv
+import io
 import os
 from pathlib import Path
 import json
-import re
+import logging
+import multiprocessing
+import tempfile
+import threading
+import time
+
+from documents import FORMATS, MEDIA_TYPES, detect_format, open_document
+from file_lock import FileLock
+from jobs import JobRegistry
+from map_store import MapFile
+from metrics import MetricsRegistry
+from model_format import OverlayMap, load_compiled_model
+from phrase_matcher import PhraseMatcher
+from snapshot_store import SnapshotStore
+from tokenizer import clause_chunks, document_key, iter_paragraphs, split_sentences, tokenize, tokenize_hindi, tokenize_sentences
+from training_store import TrainingStore
+from translation_cache import LRUCache
+
+logger = logging.getLogger("translator")
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -14,37 +40,393 @@ app = FastAPI(
 )
 
 # Model paths and configurations
-MODEL_DIR = Path("models")
-MODEL_DIR.mkdir(exist_ok=True)
+# Nothing is created here at import time; each store creates its files when first used
+MODEL_DIR = Path(os.getenv("TRANSLATOR_MODEL_DIR", "models"))
 TRANSLATION_MAP_PATH = MODEL_DIR / "translation_map.json"
 PHRASE_MAP_PATH = MODEL_DIR / "phrase_map.json"
 TRAINING_DATA_PATH = MODEL_DIR / "training_data.json"
+TRAINING_DB_PATH = MODEL_DIR / "training_data.db"
+# Versioned binary snapshots compiled from the maps; memory-mapped and shared by all
+# workers. The newest TRANSLATOR_MODEL_SNAPSHOTS are kept for rollback
+SNAPSHOT_DIR = MODEL_DIR / "snapshots"
+MODEL_SNAPSHOTS_KEPT = int(os.getenv("TRANSLATOR_MODEL_SNAPSHOTS", "5"))
+snapshot_store = SnapshotStore(SNAPSHOT_DIR, keep=MODEL_SNAPSHOTS_KEPT)
+# How often (seconds) a process checks whether another process published a new model
+MODEL_REFRESH_SECONDS = float(os.getenv("TRANSLATOR_MODEL_REFRESH_SECONDS", "1.0"))
+# Fast start: the server accepts connections at once and loads the model in the
+# background; /health/ready answers 503 until it is loaded. Requests that arrive
+# earlier wait for the load. TRANSLATOR_FAST_START=0 loads the model before serving
+FAST_START = os.getenv("TRANSLATOR_FAST_START", "1") != "0"
+
+# Training pairs are appended to SQLite (training_data.json is imported once);
+# map updates are logged as deltas and compacted into the JSON maps periodically
+MAP_COMPACT_EVERY = int(os.getenv("TRANSLATOR_MAP_COMPACT_EVERY", "10000"))
+training_store = TrainingStore(TRAINING_DB_PATH, legacy_json_path=TRAINING_DATA_PATH)
+word_map_file = MapFile(TRANSLATION_MAP_PATH, compact_every=MAP_COMPACT_EVERY)
+phrase_map_file = MapFile(PHRASE_MAP_PATH, compact_every=MAP_COMPACT_EVERY)
+
+# Multi-worker mode (uvicorn --workers N, or TRANSLATOR_API_WORKERS with `python main.py`):
+# each worker serves translations from the shared snapshot and reloads when it changes.
+# Training runs in whichever worker received the request, but only while holding the
+# writer lock, so one worker at a time writes the store, delta logs and snapshots.
+# Job status lives in a shared SQLite file so any worker can answer a poll
+API_WORKERS = int(os.getenv("TRANSLATOR_API_WORKERS", "1"))
+writer_lock = FileLock(MODEL_DIR / "writer.lock")
+JOBS_DB_PATH = MODEL_DIR / "jobs.db"
+
+# Phrase table extraction: English phrases of 2..TRANSLATOR_PHRASE_MAX_LENGTH words are
+# kept if their best translation was seen at least MIN_COUNT times and accounts for at
+# least MIN_PROBABILITY of the phrase's occurrences
+PHRASE_MAX_LENGTH = int(os.getenv("TRANSLATOR_PHRASE_MAX_LENGTH", "4"))
+PHRASE_MIN_COUNT = int(os.getenv("TRANSLATOR_PHRASE_MIN_COUNT", "2"))
+PHRASE_MIN_PROBABILITY = float(os.getenv("TRANSLATOR_PHRASE_MIN_PROBABILITY", "0.3"))
+
+# Batch translation: batches at least this large are sharded across a process pool
+BATCH_WORKERS = int(os.getenv("TRANSLATOR_BATCH_WORKERS", os.cpu_count() or 1))
+BATCH_PARALLEL_THRESHOLD = int(os.getenv("TRANSLATOR_BATCH_PARALLEL_THRESHOLD", "64"))
+
+# Translation runs on a bounded thread pool so CPU work never blocks the event loop;
+# training and persistence run one job at a time on their own worker thread
+TRANSLATION_WORKERS = int(os.getenv("TRANSLATOR_TRANSLATION_WORKERS", min(4, os.cpu_count() or 1)))
+translation_executor = ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS, thread_name_prefix="translate")
+training_jobs = JobRegistry(max_workers=1, name="train", store_path=JOBS_DB_PATH)
+
+# Bulk ingestion: uploads are stored in batches of this many pairs, and new uploads
+# are refused with 503 + Retry-After while this many training jobs are pending, or
+# with 413 once they grow past TRAINING_UPLOAD_MAX_BYTES
+BULK_INSERT_BATCH = int(os.getenv("TRANSLATOR_BULK_INSERT_BATCH", "5000"))
+MAX_PENDING_TRAINING_JOBS = int(os.getenv("TRANSLATOR_MAX_PENDING_TRAINING_JOBS", "4"))
+TRAINING_UPLOAD_MAX_BYTES = int(os.getenv("TRANSLATOR_TRAINING_UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+# Largest page /train/data returns
+TRAINING_DATA_PAGE_MAX = int(os.getenv("TRANSLATOR_TRAINING_DATA_PAGE_MAX", "1000"))
+
+# Streaming translation: text without a paragraph break is cut at a sentence
+# boundary once this many characters are buffered
+STREAM_MAX_PARAGRAPH_CHARS = int(os.getenv("TRANSLATOR_STREAM_MAX_PARAGRAPH_CHARS", "20000"))
+# Uploaded bodies larger than this are spooled to a temporary file instead of RAM,
+# and bodies larger than STREAM_MAX_BYTES are refused with 413
+STREAM_SPOOL_MAX_BYTES = int(os.getenv("TRANSLATOR_STREAM_SPOOL_MAX_BYTES", str(1024 * 1024)))
+STREAM_MAX_BYTES = int(os.getenv("TRANSLATOR_STREAM_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# File translation: uploaded .txt/.csv/.docx files are translated as jobs, at most
+# DOCUMENT_JOB_WORKERS at a time; uploads get 503 + Retry-After once
+# MAX_PENDING_DOCUMENT_JOBS are queued or running. Each job sends chunks of
+# DOCUMENT_CHUNK_UNITS paragraphs/cells to the translation pool and holds at most
+# DOCUMENT_MAX_IN_FLIGHT chunks, so its memory does not grow with the file size
+DOCUMENT_DIR = Path(os.getenv("TRANSLATOR_DOCUMENT_DIR", "documents"))
+DOCUMENT_JOB_WORKERS = int(os.getenv("TRANSLATOR_DOCUMENT_JOB_WORKERS", "2"))
+MAX_PENDING_DOCUMENT_JOBS = int(os.getenv("TRANSLATOR_MAX_PENDING_DOCUMENT_JOBS", "16"))
+DOCUMENT_MAX_BYTES = int(os.getenv("TRANSLATOR_DOCUMENT_MAX_BYTES", str(100 * 1024 * 1024)))
+DOCUMENT_CHUNK_UNITS = int(os.getenv("TRANSLATOR_DOCUMENT_CHUNK_UNITS", "32"))
+DOCUMENT_MAX_IN_FLIGHT = int(os.getenv("TRANSLATOR_DOCUMENT_MAX_IN_FLIGHT", str(TRANSLATION_WORKERS)))
+# Translated files are deleted this many seconds after they were written
+DOCUMENT_RESULT_TTL = float(os.getenv("TRANSLATOR_DOCUMENT_RESULT_TTL_SECONDS", str(24 * 3600)))
+document_jobs = JobRegistry(max_workers=DOCUMENT_JOB_WORKERS, name="document", store_path=JOBS_DB_PATH)
+
+# Input limits: /translate refuses texts over MAX_TEXT_CHARS (413) and queues texts over
+# MAX_INLINE_CHARS as document jobs (202 + job id), so one large request never holds a
+# translation thread for long; batches are refused over MAX_BATCH_CHARS in total and
+# their items are limited to MAX_INLINE_CHARS. Sentences of more than MAX_SENTENCE_TOKENS
+# words skip the translation memory and are translated in clause-sized chunks
+MAX_TEXT_CHARS = int(os.getenv("TRANSLATOR_MAX_TEXT_CHARS", "1000000"))
+MAX_INLINE_CHARS = int(os.getenv("TRANSLATOR_MAX_INLINE_CHARS", "20000"))
+MAX_BATCH_CHARS = int(os.getenv("TRANSLATOR_MAX_BATCH_CHARS", "1000000"))
+MAX_SENTENCE_TOKENS = int(os.getenv("TRANSLATOR_MAX_SENTENCE_TOKENS", "64"))
+
+# Sentences remembered per document (request, stream or file job) so repeats are translated once
+DOCUMENT_REPEAT_SENTENCES = int(os.getenv("TRANSLATOR_DOCUMENT_REPEAT_SENTENCES", "10000"))
+
+# Sentence-level translation cache; keys include the model version so retraining never serves stale entries
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATOR_CACHE_SIZE", "10000"))
+
+# Translation memory: sentences with no exact phrase map entry get the stored translation
+# of the most similar stored sentence (character-trigram Jaccard similarity) at or above
+# TM_MIN_SIMILARITY. Only sentences of at least TM_MIN_TOKENS words are indexed or matched
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATOR_TRANSLATION_MEMORY", "1") != "0"
+TM_MIN_SIMILARITY = float(os.getenv("TRANSLATOR_TM_MIN_SIMILARITY", "0.75"))
+TM_MIN_TOKENS = int(os.getenv("TRANSLATOR_TM_MIN_TOKENS", "5"))
+# Indexes loaded models in the background so loading stays fast
+memory_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory")
+# Set in batch workers, which build the index before translating so their results match the server's
+build_memory_inline = False
+
+# Per-stage latency histograms and counters, exported at /metrics (TRANSLATOR_METRICS=0 disables)
+metrics = MetricsRegistry(enabled=os.getenv("TRANSLATOR_METRICS", "1") != "0")
+STAGE_SECONDS = metrics.histogram("stage_seconds", "Time spent in each pipeline stage", ("stage",))
+REQUEST_SECONDS = metrics.histogram("request_seconds", "Translation request latency", ("endpoint",))
+REQUESTS_TOTAL = metrics.counter("requests_total", "Translation requests received", ("endpoint",))
+ERRORS_TOTAL = metrics.counter("errors_total", "Requests or jobs that failed", ("endpoint",))
+CHARACTERS_TOTAL = metrics.counter("characters_translated_total", "Characters of source text translated")
+SENTENCES_TOTAL = metrics.counter(
+    "sentences_total", "Sentences translated, by how the translation was found", ("source",)
+)
+COALESCED_TOTAL = metrics.counter(
+    "coalesced_requests_total", "Translation requests answered by an identical request already in flight"
+)
+MODEL_VERSION_GAUGE = metrics.gauge("model_version", "Version of the loaded translation model")
+MAP_SIZE_GAUGE = metrics.gauge("map_entries", "Entries in the translation maps", ("map",))
+CACHE_GAUGE = metrics.gauge("cache", "Translation cache statistics", ("stat",))
 
-# Global variables for the translation model
-word_translation_map = {}
-phrase_translation_map = {}
+class TranslationModel:
+    """One version of the translation maps together with their phrase matcher
+    
+    Requests read the active model through the single `active_model` reference,
+    so a rebuilt model is built off to the side and published with one assignment.
+    """
+    
+    def __init__(self, word_map=None, phrase_map=None, compiled=None, snapshot_version=None,
+                 memory=TRANSLATION_MEMORY_ENABLED):
+        self.word_map = word_map if word_map is not None else {}
+        self.phrase_map = phrase_map if phrase_map is not None else {}
+        self.compiled = compiled
+        self.snapshot_version = snapshot_version
+        self.version = 0
+        
+        if isinstance(self.phrase_map, OverlayMap):
+            # The compiled phrase index already covers the base map; the trie only
+            # needs the entries added since the snapshot was written
+            self.matcher = PhraseMatcher(table=compiled.phrase_index)
+            for phrase in self.phrase_map.deleted:
+                self.matcher.remove_phrase(phrase)
+            self.matcher.add_phrases(self.phrase_map.overlay)
+        else:
+            self.matcher = PhraseMatcher(self.phrase_map)
+        
+        # Filled by build_translation_memory, or by update_translation_maps as entries are added
+        self.memory = None
+        if memory:
+            # Imported here so NumPy is only loaded once a real model exists
+            from translation_memory import TranslationMemory
+            self.memory = TranslationMemory(min_similarity=TM_MIN_SIMILARITY, min_tokens=TM_MIN_TOKENS)
+            self.memory.ready = not self.phrase_map
+
+# Global variables for the translation model; a placeholder until load_model runs
+active_model = TranslationModel(memory=False)
 is_model_loaded = False
+model_version = 0
+# Serialises publishing, persisting and reloading the model
+model_lock = threading.RLock()
+# On-disk state the active model was loaded from or last saved as
+loaded_disk_state = None
+last_refresh_check = 0.0
+translation_cache = LRUCache(TRANSLATION_CACHE_SIZE)
+# /translate requests being computed, by document_key; identical concurrent requests await the same future
+inflight_translations = {}
+batch_pool = None
+
+def publish_model(model):
+    """Make model the active model; also used to mark in-place updates with a new version"""
+    global active_model, model_version
+    with model_lock:
+        model_version += 1
+        model.version = model_version
+        active_model = model
+    # Entries keyed by older versions can never be hit again; free them now rather than on eviction
+    translation_cache.clear()
+
+def model_disk_state():
+    """Fingerprint of the current snapshot pointer and both delta logs"""
+    return (snapshot_store.fingerprint(), word_map_file.fingerprint(), phrase_map_file.fingerprint())
+
+def snapshot_is_current():
+    """True if a snapshot is published and is at least as new as the JSON maps"""
+    if snapshot_store.current_version() is None:
+        return False
+    return snapshot_store.mtime() >= max(word_map_file.mtime(), phrase_map_file.mtime())
+
+def save_translation_maps(model=None):
+    """Publish a full snapshot of the maps as a new model version and as JSON"""
+    global loaded_disk_state
+    model = model or active_model
+    
+    with model_lock, metrics.timer(STAGE_SECONDS, stage="persist"):
+        # Readers follow CURRENT, so the delta logs are only dropped once the
+        # snapshot that contains them is current; no reader sees a partial model
+        version = snapshot_store.write(model.word_map, model.phrase_map)
+        word_map_file.write_snapshot(model.word_map)
+        phrase_map_file.write_snapshot(model.phrase_map)
+        snapshot_store.activate(version)
+        word_map_file.clear_deltas()
+        phrase_map_file.clear_deltas()
+        snapshot_store.prune()
+        
+        model.snapshot_version = version
+        loaded_disk_state = model_disk_state()
+
+def read_model_from_disk():
+    """Build a model from the current snapshot plus deltas, or import the JSON maps"""
+    if snapshot_is_current():
+        # mmap the snapshot and layer any deltas logged since it was published on top
+        version = snapshot_store.current_version()
+        compiled = load_compiled_model(snapshot_store.path(version))
+        return TranslationModel(
+            OverlayMap(compiled.words, word_map_file.load_deltas()),
+            OverlayMap(compiled.phrases, phrase_map_file.load_deltas()),
+            compiled,
+            version
+        )
+    
+    # JSON maps are the import format: load them and publish a snapshot for next time.
+    # Without waiting for the writer lock: whichever worker holds it publishes, and
+    # the others pick that snapshot up on their next refresh
+    model = TranslationModel(word_map_file.load(), phrase_map_file.load())
+    if (model.word_map or model.phrase_map) and writer_lock.acquire(blocking=False):
+        try:
+            model.snapshot_version = snapshot_store.publish(model.word_map, model.phrase_map)
+        finally:
+            writer_lock.release()
+    return model
 
 def load_model():
-    """Load translation maps if they exist"""
-    global word_translation_map, phrase_translation_map, is_model_loaded
+    """Load the translation model from disk and make it the active model"""
+    global is_model_loaded, loaded_disk_state
     
-    if TRANSLATION_MAP_PATH.exists():
-        with open(TRANSLATION_MAP_PATH, 'r', encoding='utf-8') as f:
-            word_translation_map = json.load(f)
+    with model_lock:
+        disk_state = model_disk_state()
+        with metrics.timer(STAGE_SECONDS, stage="load_model"):
+            model = read_model_from_disk()
+        if model.compiled is None:
+            # Importing the JSON maps published a snapshot, which changed the disk state
+            disk_state = model_disk_state()
+        previous = active_model
+        publish_model(model)
+        attach_translation_memory(model, previous)
+        loaded_disk_state = disk_state
+        is_model_loaded = True
     
-    if PHRASE_MAP_PATH.exists():
-        with open(PHRASE_MAP_PATH, 'r', encoding='utf-8') as f:
-            phrase_translation_map = json.load(f)
+    print(f"Model loaded: {len(model.word_map)} word mappings and {len(model.phrase_map)} phrase mappings")
+
+def prewarm_model():
+    """Compile the JSON maps into a current snapshot unless one exists; returns its version
     
-    is_model_loaded = True
-    print(f"Model loaded: {len(word_translation_map)} word mappings and {len(phrase_translation_map)} phrase mappings")
+    Run ahead of time (python main.py --prewarm, e.g. while building an image)
+    so servers start by memory-mapping the snapshot instead of parsing JSON.
+    """
+    with writer_lock:
+        if not snapshot_is_current():
+            word_map, phrase_map = word_map_file.load(), phrase_map_file.load()
+            if word_map or phrase_map:
+                snapshot_store.publish(word_map, phrase_map)
+    return snapshot_store.current_version()
+
+def ensure_model_loaded():
+    """Load the model unless it is loaded; waits for a load already in progress"""
+    if not is_model_loaded:
+        with model_lock:
+            if not is_model_loaded:
+                load_model()
+
+def load_model_in_background():
+    """Load the model after startup (fast start); requests load it themselves if this fails"""
+    started = time.perf_counter()
+    try:
+        ensure_model_loaded()
+    except Exception as e:
+        logger.exception("Background model load failed: %s", e)
+        return
+    print(f"Model ready {time.perf_counter() - started:.2f}s after startup")
+
+def build_translation_memory(model):
+    """Index every phrase map key of a loaded model (runs on the memory thread)"""
+    if model is not active_model:
+        return
+    with metrics.timer(STAGE_SECONDS, stage="memory_build"):
+        # Training adds entries under model_lock, so take a consistent list of keys
+        with model_lock:
+            keys = list(model.phrase_map)
+        model.memory.add_many(keys)
+        model.memory.ready = True
+
+def attach_translation_memory(model, previous):
+    """Give a freshly loaded model its translation memory"""
+    if model.memory is None or model.memory.ready:
+        return
+    if (previous.memory is not None and model.compiled is not None
+            and previous.snapshot_version == model.snapshot_version):
+        # Same snapshot with more deltas (a reload after another process trained):
+        # keep the existing index and add only the entries logged since
+        model.memory = previous.memory
+        for key in model.phrase_map.deleted:
+            model.memory.remove(key)
+        model.memory.add_many(model.phrase_map.overlay)
+        return
+    if build_memory_inline:
+        build_translation_memory(model)
+    else:
+        memory_executor.submit(build_translation_memory, model)
+
+def refresh_model_if_changed(interval=None):
+    """Reload the model if another process published a snapshot or logged deltas"""
+    global last_refresh_check
+    interval = MODEL_REFRESH_SECONDS if interval is None else interval
+    
+    now = time.monotonic()
+    if now - last_refresh_check < interval:
+        return
+    last_refresh_check = now
+    
+    if model_disk_state() != loaded_disk_state:
+        with model_lock:
+            # Another thread may have reloaded while we waited for the lock
+            if model_disk_state() != loaded_disk_state:
+                load_model()
+
+@contextmanager
+def model_writer():
+    """Become the only writer of the model files across all worker processes
+    
+    Training jobs run inside this. The active model is first reloaded if
+    another worker changed the files, so updates are applied on top of the
+    newest model and never lost.
+    """
+    with writer_lock:
+        refresh_model_if_changed(interval=0)
+        yield
 
 # Load model at startup
 @app.on_event("startup")
 async def startup_event():
+    if FAST_START:
+        threading.Thread(target=load_model_in_background, name="load-model", daemon=True).start()
+    else:
+        load_model()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    reset_batch_pool()
+    translation_executor.shutdown(wait=False)
+    memory_executor.shutdown(wait=False, cancel_futures=True)
+    training_jobs.shutdown()
+    document_jobs.shutdown()
+
+def _init_batch_worker():
+    """Preload the translation model in a batch worker process"""
+    global build_memory_inline
+    # Workers mmap the same snapshot as the server and share its pages; they pick up
+    # new versions through refresh_model_if_changed instead of being restarted
+    build_memory_inline = True
     load_model()
 
+def get_batch_pool():
+    """Return the process pool for batch translation, starting it if needed"""
+    global batch_pool
+    if batch_pool is None:
+        # Spawned, not forked: a forked worker would inherit locks held by other
+        # threads and thread pools (the memory thread) whose threads do not exist
+        batch_pool = ProcessPoolExecutor(
+            max_workers=BATCH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_batch_worker
+        )
+    return batch_pool
+
+def reset_batch_pool():
+    """Shut down the batch pool; the next batch starts new workers"""
+    global batch_pool
+    if batch_pool is not None:
+        batch_pool.shutdown(wait=False)
+        batch_pool = None
+
 class TranslationRequest(BaseModel):
     text: str
     preserve_formatting: Optional[bool] = True
@@ -54,38 +436,48 @@ class TranslationResponse(BaseModel):
     source_text: str
     success: bool
     error: Optional[str] = None
+    job_id: Optional[str] = None
+
+class BatchTranslationRequest(BaseModel):
+    texts: List[str]
+    preserve_formatting: Optional[bool] = True
+
+class BatchTranslationResponse(BaseModel):
+    translations: List[TranslationResponse]
+    count: int
 
 class TrainingDataRequest(BaseModel):
     training_pairs: List[Dict[str, str]]  # List of {english: "...", hindi: "..."}
 
+class TrainingPair(BaseModel):
+    english: str
+    hindi: str
+
 class TrainingDataResponse(BaseModel):
     success: bool
     message: str
     pairs_count: int
+    job_id: Optional[str] = None
 
-def simple_tokenize(text):
-    """Simple tokenization function that splits text into words"""
-    # Remove punctuation and split by whitespace
-    return re.sub(r'[^\w\s]', '', text.lower()).split()
+def iter_preprocessed(text):
+    """Yield the Sentences of each paragraph lazily, in document order"""
+    # One scan of the text finds paragraph breaks and sentence ends; each
+    # Sentence carries the normalised text and tokens used by later stages
+    paragraphs = iter_paragraphs(text)
+    while True:
+        with metrics.timer(STAGE_SECONDS, stage="preprocess"):
+            sentences = next(paragraphs, None)
+        if sentences is None:
+            return
+        yield sentences
 
 def preprocess_text(text):
     """Clean and tokenize text"""
-    # Preserve paragraph breaks for formatting
-    paragraphs = text.split('\n\n')
-    processed_paragraphs = []
-    
-    for paragraph in paragraphs:
-        # Simple sentence splitting by periods, question marks, and exclamation marks
-        sentences = re.split(r'[.!?]+', paragraph)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        processed_paragraphs.append(sentences)
-    
-    return processed_paragraphs
+    return list(iter_preprocessed(text))
 
 def extract_phrases(text, max_phrase_length=4):
     """Extract potential phrases from text for phrase-based translation"""
-    tokens = simple_tokenize(text)
+    tokens = tokenize(text)
     phrases = []
     
     # Extract phrases of different lengths
@@ -96,65 +488,198 @@ def extract_phrases(text, max_phrase_length=4):
     
     return phrases
 
-def translate_text_with_model(text):
-    """Translate English text to Hindi using the trained statistical model"""
+def translate_sentence(sentence, model=None):
+    """Translate a single tokenizer.Sentence, using the LRU cache when possible"""
+    model = model or active_model
+    normalized = sentence.normalized
+    key = (model.version, normalized)
+    cached = translation_cache.get(key)
+    if cached is not None:
+        SENTENCES_TOTAL.inc(source="cache")
+        return cached
+    
+    # Check if the entire sentence is in the phrase map
+    with metrics.timer(STAGE_SECONDS, stage="phrase_lookup"):
+        translation = model.phrase_map.get(normalized)
+    
+    if translation is not None:
+        SENTENCES_TOTAL.inc(source="exact")
+    elif len(sentence.tokens) > MAX_SENTENCE_TOKENS:
+        # Run-on sentences are translated clause by clause without a memory lookup,
+        # whose cost grows with their length; they rarely recur, so they are not cached
+        with metrics.timer(STAGE_SECONDS, stage="token_pass"):
+            translation = " ".join(
+                token
+                for chunk in clause_chunks(sentence.text, MAX_SENTENCE_TOKENS)
+                for token in model.matcher.translate_tokens(chunk, model.word_map)
+            )
+        SENTENCES_TOTAL.inc(source="chunked")
+        return translation
+    elif model.memory is not None:
+        # Near-duplicates of stored sentences get the stored translation
+        with metrics.timer(STAGE_SECONDS, stage="memory_lookup"):
+            match = model.memory.lookup(sentence.tokens)
+        if match is not None:
+            translation = model.phrase_map.get(match[0])
+            if translation is not None:
+                SENTENCES_TOTAL.inc(source="memory")
+    
+    if translation is None:
+        # Single longest-match-first pass over the tokens: phrases from
+        # the compiled matcher, remaining tokens from the word map
+        with metrics.timer(STAGE_SECONDS, stage="token_pass"):
+            tokens = model.matcher.translate_tokens(sentence.tokens, model.word_map)
+            translation = " ".join(tokens)
+        SENTENCES_TOTAL.inc(source="fallback")
+    
+    translation_cache.put(key, translation)
+    return translation
+
+def translate_paragraph(sentences, model=None, seen=None):
+    """Translate the sentences of one paragraph and join them
+    
+    seen maps normalized sentences to translations already made for the same
+    document, so a repeated sentence is translated once.
+    """
+    model = model or active_model
+    seen = {} if seen is None else seen
+    translated_sentences = []
+    
+    for sentence in sentences:
+        translation = seen.get(sentence.normalized)
+        if translation is None:
+            translation = translate_sentence(sentence, model)
+            if len(seen) < DOCUMENT_REPEAT_SENTENCES:
+                seen[sentence.normalized] = translation
+        else:
+            SENTENCES_TOTAL.inc(source="repeat")
+        translated_sentences.append(translation)
+    
+    # Combine translated sentences into a paragraph
+    return ". ".join(translated_sentences)
+
+def translate_text_with_model(text, seen=None):
+    """Translate English text to Hindi using the trained statistical model
+    
+    Repeated sentences are translated once per call; pass the same seen dict
+    to share them across calls for one document.
+    """
     try:
-        if not is_model_loaded:
-            load_model()
+        ensure_model_loaded()
+        refresh_model_if_changed()
         
-        # Process text by paragraphs to preserve formatting
-        paragraphs = preprocess_text(text)
-        translated_paragraphs = []
+        # The whole text is translated by one model version, even if a new one is published meanwhile
+        model = active_model
         
-        for paragraph in paragraphs:
-            translated_sentences = []
-            
-            for sentence in paragraph:
-                if not sentence:
-                    continue
-                    
-                # Check if the entire sentence is in the phrase map
-                if sentence.lower() in phrase_translation_map:
-                    translated_sentences.append(phrase_translation_map[sentence.lower()])
-                    continue
-                
-                # Extract phrases and check for matches
-                phrases = extract_phrases(sentence)
-                
-                # Sort phrases by length in descending order for better matching
-                phrases.sort(key=len, reverse=True)
-                
-                # First try to translate any phrases we can find
-                sentence_lower = sentence.lower()
-                translated_sentence = sentence
-                
-                for phrase in phrases:
-                    if phrase in phrase_translation_map:
-                        # Simple replacement strategy
-                        translated_sentence = translated_sentence.lower().replace(phrase, phrase_translation_map[phrase])
-                
-                # Then translate individual words
-                tokens = simple_tokenize(translated_sentence)
-                for i, token in enumerate(tokens):
-                    if token.lower() in word_translation_map:
-                        tokens[i] = word_translation_map[token.lower()]
-                
-                # Combine the translated tokens into a sentence
-                word_translated_sentence = " ".join(tokens)
-                translated_sentences.append(word_translated_sentence)
-            
-            # Combine translated sentences into a paragraph
-            translated_paragraphs.append(". ".join(translated_sentences))
+        # Process text by paragraphs to preserve formatting
+        seen = {} if seen is None else seen
+        translated_paragraphs = [translate_paragraph(paragraph, model, seen) for paragraph in iter_preprocessed(text)]
         
         # Return the translated text with paragraph formatting preserved
         return "\n\n".join(translated_paragraphs)
     
     except Exception as e:
-        print(f"Translation error: {str(e)}")
+        logger.exception("Translation error: %s", e)
         raise e
 
+async def translate_coalesced(text):
+    """Translate text on the translation pool, sharing the work with identical requests in flight"""
+    key = document_key(text)
+    future = inflight_translations.get(key)
+    if future is not None:
+        COALESCED_TOTAL.inc()
+    else:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(translation_executor, translate_text_with_model, text)
+        inflight_translations[key] = future
+        future.add_done_callback(lambda _: inflight_translations.pop(key, None))
+    # A client that disconnects must not cancel the work other requests are waiting on
+    return await asyncio.shield(future)
+
+def translate_paragraphs(paragraphs, model, seen):
+    """Translate a list of preprocessed paragraphs (runs on the translation pool)"""
+    return [translate_paragraph(paragraph, model, seen) for paragraph in paragraphs]
+
+def translate_text_job(job_id, text):
+    """Translate a text too long for an inline /translate request (runs as a document job)
+    
+    Paragraphs go to the translation pool in chunks of about DOCUMENT_CHUNK_UNITS
+    sentences, at most DOCUMENT_MAX_IN_FLIGHT at a time, so the job shares the
+    pool with inline requests instead of holding a thread for the whole text.
+    """
+    started = time.perf_counter()
+    ensure_model_loaded()
+    refresh_model_if_changed()
+    model = active_model
+    in_flight = deque()
+    seen = {}
+    translated_paragraphs = []
+    
+    def collect_oldest_chunk():
+        end, future = in_flight.popleft()
+        translated_paragraphs.extend(future.result())
+        document_jobs.report(job_id, percent=round(100 * end / len(text), 1))
+    
+    try:
+        chunk, sentences, end = [], 0, 0
+        for paragraph in iter_preprocessed(text):
+            chunk.append(paragraph)
+            sentences += len(paragraph)
+            end = paragraph[-1].end if paragraph else end
+            if sentences >= DOCUMENT_CHUNK_UNITS:
+                in_flight.append((end, translation_executor.submit(translate_paragraphs, chunk, model, seen)))
+                chunk, sentences = [], 0
+                if len(in_flight) >= DOCUMENT_MAX_IN_FLIGHT:
+                    collect_oldest_chunk()
+        if chunk:
+            in_flight.append((len(text), translation_executor.submit(translate_paragraphs, chunk, model, seen)))
+        while in_flight:
+            collect_oldest_chunk()
+    
+    except Exception:
+        ERRORS_TOTAL.inc(endpoint="translate")
+        for _, future in in_flight:
+            future.cancel()
+        raise
+    
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="translate_job")
+    CHARACTERS_TOTAL.inc(len(text))
+    document_jobs.report(job_id, percent=100.0)
+    return {"translation": "\n\n".join(translated_paragraphs), "characters": len(text)}
+
 @app.post("/translate", response_model=TranslationResponse)
 async def translate_text(request: TranslationRequest):
+    """Translate a text, or queue it as a job if it is longer than MAX_INLINE_CHARS
+    
+    A queued text gets 202 with its job_id; poll /translate/jobs/{job_id} for the
+    translation. Texts longer than MAX_TEXT_CHARS are refused with 413.
+    """
+    REQUESTS_TOTAL.inc(endpoint="translate")
+    if len(request.text) > MAX_TEXT_CHARS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Text is longer than {MAX_TEXT_CHARS} characters; use /translate/stream or /translate/file"
+        )
+    
+    if len(request.text) > MAX_INLINE_CHARS and request.text.strip():
+        if document_jobs.pending() >= MAX_PENDING_DOCUMENT_JOBS:
+            return JSONResponse(
+                status_code=503,
+                content={"success": False, "message": "Too many texts queued for translation, retry later"},
+                headers={"Retry-After": "30"}
+            )
+        job_id = document_jobs.new_id()
+        document_jobs.submit("translate-text", translate_text_job, job_id, request.text.strip(), job_id=job_id)
+        return JSONResponse(
+            status_code=202,
+            content={
+                "success": True,
+                "message": "Text queued for translation",
+                "job_id": job_id,
+                "status_url": f"/translate/jobs/{job_id}"
+            }
+        )
+    
     try:
         if not request.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
@@ -162,7 +687,9 @@ async def translate_text(request: TranslationRequest):
         # Process the text based on formatting preference
         input_text = request.text.strip()
         
-        translation = translate_text_with_model(input_text)
+        with metrics.timer(REQUEST_SECONDS, endpoint="translate"):
+            translation = await translate_coalesced(input_text)
+        CHARACTERS_TOTAL.inc(len(input_text))
 
         if not translation:
             raise HTTPException(
@@ -178,6 +705,7 @@ async def translate_text(request: TranslationRequest):
 
     except Exception as e:
         error_message = str(e)
+        ERRORS_TOTAL.inc(endpoint="translate")
         
         return TranslationResponse(
             translation="",
@@ -186,152 +714,972 @@ async def translate_text(request: TranslationRequest):
             error=error_message
         )
 
+@app.get("/translate/jobs/{job_id}")
+async def get_text_translation_job(job_id: str):
+    """Report the status and progress of a queued text translation; the result holds the translation"""
+    job = await asyncio.get_running_loop().run_in_executor(None, document_jobs.get, job_id)
+    if job is None or job["kind"] != "translate-text":
+        raise HTTPException(status_code=404, detail="Translation job not found")
+    return job
+
+async def iter_stream_paragraphs(chunks):
+    """Split an async stream of UTF-8 byte chunks into (text, end_of_paragraph) pieces
+    
+    Only the current paragraph is buffered. A paragraph longer than
+    STREAM_MAX_PARAGRAPH_CHARS is emitted in pieces cut at sentence boundaries.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        while True:
+            end = buffer.find("\n\n")
+            if end != -1:
+                yield buffer[:end], True
+                buffer = buffer[end + 2:]
+            elif len(buffer) > STREAM_MAX_PARAGRAPH_CHARS:
+                cut = max(buffer.rfind(mark, 0, STREAM_MAX_PARAGRAPH_CHARS) for mark in ".!?")
+                if cut == -1:
+                    cut = buffer.rfind(" ", 0, STREAM_MAX_PARAGRAPH_CHARS)
+                if cut == -1:
+                    cut = STREAM_MAX_PARAGRAPH_CHARS - 1
+                yield buffer[:cut + 1], False
+                buffer = buffer[cut + 1:]
+            else:
+                break
+    
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer, True
+
+async def stream_translation(chunks):
+    """Translate a byte stream piece by piece, yielding one NDJSON line per piece"""
+    loop = asyncio.get_running_loop()
+    index = 0
+    
+    try:
+        if not is_model_loaded:
+            await loop.run_in_executor(translation_executor, ensure_model_loaded)
+        await loop.run_in_executor(translation_executor, refresh_model_if_changed)
+        model = active_model
+        seen = {}
+        
+        async for text, end_of_paragraph in iter_stream_paragraphs(chunks):
+            translation = await loop.run_in_executor(
+                translation_executor, translate_paragraph, tokenize_sentences(text), model, seen
+            )
+            CHARACTERS_TOTAL.inc(len(text))
+            yield json.dumps({
+                "index": index,
+                "translation": translation,
+                "end_of_paragraph": end_of_paragraph
+            }, ensure_ascii=False) + "\n"
+            index += 1
+        
+        yield json.dumps({"done": True, "count": index}) + "\n"
+    
+    except Exception as e:
+        logger.exception("Streaming translation error: %s", e)
+        ERRORS_TOTAL.inc(endpoint="translate_stream")
+        yield json.dumps({"done": True, "count": index, "error": str(e)}) + "\n"
+
+@app.post("/translate/stream")
+async def translate_stream(request: Request):
+    """Translate a document progressively, streaming NDJSON as paragraphs are translated
+    
+    Send the document as a text/plain body to keep memory bounded; a JSON
+    TranslationRequest body is also accepted. Pieces with end_of_paragraph set
+    are followed by a paragraph break, others continue the same paragraph.
+    """
+    REQUESTS_TOTAL.inc(endpoint="translate_stream")
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = TranslationRequest(**await request.json())
+        except (ValueError, TypeError) as e:
+            # Malformed JSON, a body that is not an object, or fields of the wrong type
+            raise HTTPException(status_code=422, detail=f"Invalid translation request: {e}")
+        if len(body.text) > MAX_TEXT_CHARS:
+            raise HTTPException(status_code=413, detail=f"Text is longer than {MAX_TEXT_CHARS} characters; send it as text/plain")
+        
+        async def chunks():
+            yield body.text.encode("utf-8")
+        
+        return StreamingResponse(stream_translation(chunks()), media_type="application/x-ndjson")
+    
+    # The body has to be read before the response starts (the response listens
+    # for disconnects on the same channel), so spool it rather than holding it in RAM
+    spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_BYTES)
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > STREAM_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Text is larger than {STREAM_MAX_BYTES} bytes")
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    
+    async def spooled_chunks():
+        try:
+            while True:
+                chunk = spool.read(64 * 1024)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            spool.close()
+    
+    return StreamingResponse(stream_translation(spooled_chunks()), media_type="application/x-ndjson")
+
+def translate_batch(texts):
+    """Translate a list of texts, returning (translation, error) pairs in order"""
+    # Batch workers check for a new model on every chunk, not just once per interval
+    refresh_model_if_changed(interval=0)
+    results = []
+    # Identical texts in the chunk are translated once, and so are repeated sentences
+    done = {}
+    seen = {}
+    for text in texts:
+        if not text.strip():
+            results.append(("", "Text cannot be empty"))
+            continue
+        if len(text) > MAX_INLINE_CHARS:
+            results.append(("", f"Text is longer than {MAX_INLINE_CHARS} characters; send it to /translate"))
+            continue
+        key = document_key(text)
+        if key in done:
+            results.append(done[key])
+            continue
+        try:
+            translation = translate_text_with_model(text.strip(), seen)
+            if translation:
+                result = (translation, None)
+            else:
+                result = ("", "Translation model returned empty response")
+        except Exception as e:
+            result = ("", str(e))
+        done[key] = result
+        results.append(result)
+    return results
+
+@app.post("/translate/batch", response_model=BatchTranslationResponse)
+async def translate_batch_endpoint(request: BatchTranslationRequest):
+    REQUESTS_TOTAL.inc(endpoint="translate_batch")
+    texts = request.texts
+    if sum(len(text) for text in texts) > MAX_BATCH_CHARS:
+        raise HTTPException(status_code=413, detail=f"Batch is longer than {MAX_BATCH_CHARS} characters in total")
+    started = time.perf_counter()
+    
+    loop = asyncio.get_running_loop()
+    
+    if BATCH_WORKERS <= 1 or len(texts) < BATCH_PARALLEL_THRESHOLD:
+        results = await loop.run_in_executor(translation_executor, translate_batch, texts)
+    else:
+        # Several chunks per worker so uneven documents still balance across cores
+        chunk_size = max(1, -(-len(texts) // (BATCH_WORKERS * 4)))
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        
+        pool = get_batch_pool()
+        chunk_results = await asyncio.gather(
+            *(loop.run_in_executor(pool, translate_batch, chunk) for chunk in chunks)
+        )
+        results = [result for chunk in chunk_results for result in chunk]
+    
+    translations = [
+        TranslationResponse(
+            translation=translation,
+            source_text=text,
+            success=error is None,
+            error=error
+        )
+        for text, (translation, error) in zip(texts, results)
+    ]
+    
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="translate_batch")
+    CHARACTERS_TOTAL.inc(sum(len(text) for text in texts))
+    
+    return BatchTranslationResponse(translations=translations, count=len(translations))
+
+def translate_chunk(texts, seen):
+    """Translate the texts of one document chunk (runs on the translation pool)
+    
+    seen is shared by every chunk of the document, so repeated sentences
+    (table cells, boilerplate) are translated once.
+    """
+    return [translate_text_with_model(text, seen) if text else "" for text in texts]
+
+def document_output_path(job_id, file_format):
+    return DOCUMENT_DIR / f"{job_id}.{file_format}"
+
+def prune_document_results():
+    """Delete translated files older than DOCUMENT_RESULT_TTL (creating the directory on first use)"""
+    DOCUMENT_DIR.mkdir(parents=True, exist_ok=True)
+    cutoff = time.time() - DOCUMENT_RESULT_TTL
+    for path in DOCUMENT_DIR.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+def translate_document_file(job_id, upload, file_format, filename, options):
+    """Translate an uploaded file chunk by chunk, keeping its structure (runs as a document job)"""
+    started = time.perf_counter()
+    output_path = document_output_path(job_id, file_format)
+    partial_path = output_path.with_suffix(".partial")
+    in_flight = deque()
+    seen = {}
+    units_translated = 0
+    
+    try:
+        with open(partial_path, "wb") as output:
+            document = open_document(file_format, upload, output, **options)
+            
+            def write_oldest_chunk():
+                nonlocal units_translated
+                records, future = in_flight.popleft()
+                translations = iter(future.result())
+                for record in records:
+                    texts = record[0]
+                    document.write(record, [next(translations) for _ in texts])
+                    units_translated += len(texts)
+                    CHARACTERS_TOTAL.inc(sum(len(text) for text in texts))
+                document_jobs.report(
+                    job_id, units_translated=units_translated, percent=round(100 * document.progress(), 1)
+                )
+            
+            records, texts = [], []
+            for record in document.records():
+                records.append(record)
+                texts.extend(record[0])
+                # Records without text (blank lines, header rows) still count towards a chunk
+                if len(texts) >= DOCUMENT_CHUNK_UNITS or len(records) >= 4 * DOCUMENT_CHUNK_UNITS:
+                    in_flight.append((records, translation_executor.submit(translate_chunk, texts, seen)))
+                    records, texts = [], []
+                    if len(in_flight) >= DOCUMENT_MAX_IN_FLIGHT:
+                        write_oldest_chunk()
+            if records:
+                in_flight.append((records, translation_executor.submit(translate_chunk, texts, seen)))
+            while in_flight:
+                write_oldest_chunk()
+            document.finish()
+        
+        os.replace(partial_path, output_path)
+    
+    except Exception:
+        ERRORS_TOTAL.inc(endpoint="translate_file")
+        for _, future in in_flight:
+            future.cancel()
+        partial_path.unlink(missing_ok=True)
+        raise
+    finally:
+        upload.close()
+    
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="translate_file")
+    document_jobs.report(job_id, percent=100.0)
+    stem = filename.rsplit(".", 1)[0] if filename else "translation"
+    return {
+        "file_format": file_format,
+        "filename": f"{stem}.hi.{file_format}",
+        "units_translated": units_translated,
+        "result_url": f"/translate/file/{job_id}/result"
+    }
+
+@app.post("/translate/file", status_code=202)
+async def translate_file(request: Request, filename: Optional[str] = None, file_format: Optional[str] = None,
+                         columns: Optional[str] = None, header: bool = True):
+    """Queue an uploaded .txt, .csv or .docx file for translation and return its job id
+    
+    Send the file as the raw request body. The format comes from ?file_format=,
+    the extension of ?filename= or the Content-Type header. For CSV files,
+    ?columns= limits translation to some columns (header names, or 0-based
+    indexes with header=false). Poll /translate/file/{job_id} for progress and
+    download the result from /translate/file/{job_id}/result.
+    """
+    REQUESTS_TOTAL.inc(endpoint="translate_file")
+    file_format = file_format or detect_format(filename, request.headers.get("content-type"))
+    if file_format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"file_format must be one of: {', '.join(FORMATS)}")
+    
+    if document_jobs.pending() >= MAX_PENDING_DOCUMENT_JOBS:
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "message": "Too many files queued for translation, retry later"},
+            headers={"Retry-After": "30"}
+        )
+    
+    # Spool the body to disk so memory does not grow with the file size
+    upload = tempfile.TemporaryFile()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > DOCUMENT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"File is larger than {DOCUMENT_MAX_BYTES} bytes")
+            upload.write(chunk)
+    except Exception:
+        upload.close()
+        raise
+    
+    await asyncio.get_running_loop().run_in_executor(None, prune_document_results)
+    options = {
+        "columns": [column.strip() for column in columns.split(",")] if columns else None,
+        "header": header,
+        "max_unit_chars": STREAM_MAX_PARAGRAPH_CHARS
+    }
+    job_id = document_jobs.new_id()
+    document_jobs.submit(
+        "translate-file", translate_document_file, job_id, upload, file_format, filename, options, job_id=job_id
+    )
+    return {"success": True, "message": "File queued for translation", "job_id": job_id}
+
+@app.get("/translate/file/{job_id}")
+async def get_file_translation_job(job_id: str):
+    """Report the status and progress of a file translation job"""
+    job = await asyncio.get_running_loop().run_in_executor(None, document_jobs.get, job_id)
+    if job is None or job["kind"] != "translate-file":
+        raise HTTPException(status_code=404, detail="File translation job not found")
+    return job
+
+@app.get("/translate/file/{job_id}/result")
+async def download_file_translation(job_id: str):
+    """Download the translated file of a completed job"""
+    job = await asyncio.get_running_loop().run_in_executor(None, document_jobs.get, job_id)
+    if job is None or job["kind"] != "translate-file":
+        raise HTTPException(status_code=404, detail="File translation job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"File translation job is {job['status']}")
+    
+    result = job["result"]
+    path = document_output_path(job_id, result["file_format"])
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Translated file has expired")
+    return FileResponse(path, media_type=MEDIA_TYPES[result["file_format"]], filename=result["filename"])
+
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy", 
+        "ready": is_model_loaded,
         "model_status": "loaded" if is_model_loaded else "not_loaded",
-        "word_map_size": len(word_translation_map),
-        "phrase_map_size": len(phrase_translation_map)
+        "word_map_size": len(active_model.word_map),
+        "phrase_map_size": len(active_model.phrase_map),
+        "model_version": active_model.version,
+        "snapshot_version": snapshot_store.current_version(),
+        "translation_cache": translation_cache.stats(),
+        "translation_memory": active_model.memory.stats() if active_model.memory is not None else None
     }
 
+@app.get("/health/live")
+async def liveness_check():
+    """The process is up and serving requests (the model may still be loading)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """200 once the model is loaded, 503 with Retry-After before that"""
+    if not is_model_loaded:
+        return JSONResponse(
+            status_code=503,
+            content={"ready": False, "model_status": "loading"},
+            headers={"Retry-After": "1"}
+        )
+    return {"ready": True, "model_version": active_model.version, "snapshot_version": active_model.snapshot_version}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus-style metrics for the translation pipeline"""
+    model = active_model
+    MODEL_VERSION_GAUGE.set(model.version)
+    MAP_SIZE_GAUGE.set(len(model.word_map), map="word")
+    MAP_SIZE_GAUGE.set(len(model.phrase_map), map="phrase")
+    for stat, value in translation_cache.stats().items():
+        CACHE_GAUGE.set(value, stat=stat)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def append_training_data(training_pairs):
+    """Append pairs to the training store and apply them to the model (runs as a training job)"""
+    with model_writer():
+        new_pairs = training_store.add_pairs(training_pairs)
+        
+        # Only the new pairs are aligned; existing word entries are left untouched
+        update_translation_maps(new_pairs)
+    
+    return {"pairs_count": training_store.count()}
+
 @app.post("/train/add-data", response_model=TrainingDataResponse)
-async def add_training_data(request: TrainingDataRequest):
+async def add_training_data(request: TrainingDataRequest, background: bool = False):
     try:
-        # Load existing training data or create new
-        training_data = []
-        if TRAINING_DATA_PATH.exists():
-            with open(TRAINING_DATA_PATH, 'r', encoding='utf-8') as f:
-                training_data = json.load(f)
-        
-        # Add new pairs
-        for pair in request.training_pairs:
-            if "english" in pair and "hindi" in pair:
-                training_data.append({
-                    "english": pair["english"].strip(),
-                    "hindi": pair["hindi"].strip()
-                })
-        
-        # Save updated training data
-        with open(TRAINING_DATA_PATH, 'w', encoding='utf-8') as f:
-            json.dump(training_data, f, ensure_ascii=False, indent=2)
-        
-        # Immediately update the translation maps
-        update_translation_maps(training_data)
+        job_id = training_jobs.submit("add-data", append_training_data, request.training_pairs)
+        
+        if background:
+            return TrainingDataResponse(
+                success=True,
+                message="Training data queued",
+                pairs_count=len(request.training_pairs),
+                job_id=job_id
+            )
+        
+        result = await asyncio.wrap_future(training_jobs.future(job_id))
         
         return TrainingDataResponse(
             success=True,
             message="Training data added and model updated",
-            pairs_count=len(training_data)
+            pairs_count=result["pairs_count"],
+            job_id=job_id
         )
     
     except Exception as e:
+        logger.exception("Failed to add training data: %s", e)
+        ERRORS_TOTAL.inc(endpoint="train_add_data")
         raise HTTPException(status_code=500, detail=f"Failed to add training data: {str(e)}")
 
-def update_translation_maps(training_data):
-    """Update word and phrase translation maps based on training data"""
-    global word_translation_map, phrase_translation_map
+def iter_uploaded_pairs(upload, data_format):
+    """Yield the rows of an uploaded CSV or JSONL file, one at a time
+    
+    Rows are not validated here; a JSONL line that is not valid JSON is yielded as None.
+    """
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", errors="replace", newline="")
+    if data_format == "csv":
+        for row in csv.DictReader(text):
+            yield {"english": row.get("english") or "", "hindi": row.get("hindi") or ""}
+    else:
+        for line in text:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+
+def ingest_training_file(upload, data_format, train):
+    """Store every valid pair from an uploaded file, then train once on the new pairs (runs as a training job)
+    
+    Rows without non-empty string english and hindi values are skipped and
+    counted as rejected.
+    """
+    try:
+        # The writer lock also keeps other workers' pairs out of the id range read back below
+        with model_writer():
+            upload.seek(0)
+            first_new_id = training_store.last_id()
+            rows = 0
+            pairs_added = 0
+            batch = []
+            
+            try:
+                for pair in iter_uploaded_pairs(upload, data_format):
+                    batch.append(pair)
+                    if len(batch) >= BULK_INSERT_BATCH:
+                        rows += len(batch)
+                        pairs_added += len(training_store.add_pairs(batch))
+                        batch = []
+                if batch:
+                    rows += len(batch)
+                    pairs_added += len(training_store.add_pairs(batch))
+            finally:
+                # One model update for the whole upload, streaming the new pairs back from the
+                # store; it also runs if reading failed, so the stored pairs are never left untrained
+                trained = train and pairs_added > 0
+                if trained:
+                    update_translation_maps(training_store.iter_pairs(after_id=first_new_id))
+        
+        return {
+            "success": True,
+            "pairs_added": pairs_added,
+            "pairs_rejected": rows - pairs_added,
+            "pairs_count": training_store.count(),
+            "trained": trained
+        }
+    finally:
+        upload.close()
+
+@app.post("/train/bulk-upload")
+async def bulk_upload_training_data(request: Request, data_format: Optional[str] = None,
+                                    train: bool = True, background: bool = False):
+    """Ingest a streamed CSV (english,hindi columns) or JSONL upload and train once
+    
+    The format is taken from ?data_format=csv|jsonl or the Content-Type header.
+    Pass train=false when uploading a corpus in several parts and rebuild the
+    model once at the end.
+    """
+    if training_jobs.pending() >= MAX_PENDING_TRAINING_JOBS:
+        # Back-pressure: clients should wait and resend instead of queueing more work
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "message": "Training queue is full, retry later"},
+            headers={"Retry-After": "2"}
+        )
+    
+    if data_format is None:
+        data_format = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    if data_format not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="data_format must be 'csv' or 'jsonl'")
+    
+    # Spool the body to disk so memory does not grow with the upload size
+    upload = tempfile.TemporaryFile()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > TRAINING_UPLOAD_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413, detail=f"Upload is larger than {TRAINING_UPLOAD_MAX_BYTES} bytes"
+                )
+            upload.write(chunk)
+    except Exception:
+        upload.close()
+        raise
+    
+    try:
+        job_id = training_jobs.submit("bulk-upload", ingest_training_file, upload, data_format, train)
+        
+        if background:
+            return {"success": True, "message": "Upload queued", "job_id": job_id}
+        
+        result = await asyncio.wrap_future(training_jobs.future(job_id))
+        return {**result, "job_id": job_id}
+    
+    except Exception as e:
+        logger.exception("Bulk upload failed: %s", e)
+        ERRORS_TOTAL.inc(endpoint="train_bulk_upload")
+        raise HTTPException(status_code=500, detail=f"Failed to ingest training data: {str(e)}")
+
+def split_pair(english_text, hindi_text):
+    """Sentence pairs of a lowercased training pair, or None if the sentence counts differ"""
+    # Both sides end sentences at .!? and danda
+    eng_sentences = split_sentences(english_text)
+    hindi_sentences = split_sentences(hindi_text)
+    if len(eng_sentences) != len(hindi_sentences):
+        return None
+    return list(zip(eng_sentences, hindi_sentences))
+
+def exact_entries(pair):
+    """The exact phrase map entries (English, Hindi) a training pair contributes"""
+    english_text = pair["english"].lower()
+    return [(english_text, pair["hindi"])] + (split_pair(english_text, pair["hindi"]) or [])
+
+def stored_translation(english):
+    """Translation the stored pairs give an exact entry most often (latest on a tie), or None"""
+    counts = {}
+    best, best_count = None, 0
+    for candidate in training_store.iter_search(english, field="english"):
+        for candidate_english, candidate_hindi in exact_entries(candidate):
+            if candidate_english == english:
+                count = counts[candidate_hindi] = counts.get(candidate_hindi, 0) + 1
+                if count >= best_count:
+                    best, best_count = candidate_hindi, count
+    return best
+
+def update_translation_maps(training_data, model=None, persist=True):
+    """Update word and phrase translation maps based on training data
+    
+    Defaults to updating the active model in place; only entries are added, so
+    concurrent translations never see a map shrink.
+    """
+    # The NumPy aligner is only needed for training, so serving-only processes never import it
+    from aligner import EncodedCorpus, IBMModel1
+    from phrase_table import extract_phrase_table
+    
+    global loaded_disk_state
+    model = model or active_model
+    started = time.perf_counter()
     
     # Create maps for words and phrases
     new_word_map = {}
     new_phrase_map = {}
+    sentence_pairs = []
+    
+    # Exact entries keep the translation seen most often for each English text
+    # (the latest one on a tie), not simply the last one inserted
+    pair_counts = {}
+    best_counts = {}
+    
+    def add_exact(english, hindi):
+        count = pair_counts[(english, hindi)] = pair_counts.get((english, hindi), 0) + 1
+        if count >= best_counts.get(english, 0):
+            best_counts[english] = count
+            new_phrase_map[english] = hindi
     
     for item in training_data:
         english_text = item["english"].lower()
         hindi_text = item["hindi"]
         
         # Add the entire sentence/paragraph as a phrase for exact matches
-        new_phrase_map[english_text] = hindi_text
-        
-        # Split into sentences for better granularity
-        eng_sentences = re.split(r'[.!?]+', english_text)
-        eng_sentences = [s.strip() for s in eng_sentences if s.strip()]
-        
-        hindi_sentences = re.split(r'[।.!?]+', hindi_text)
-        hindi_sentences = [s.strip() for s in hindi_sentences if s.strip()]
-        
-        # If we have the same number of sentences, map them directly
-        if len(eng_sentences) == len(hindi_sentences):
-            for eng_sent, hindi_sent in zip(eng_sentences, hindi_sentences):
-                new_phrase_map[eng_sent] = hindi_sent
-        
-        # Extract individual words
-        eng_words = simple_tokenize(english_text)
-        hindi_words = hindi_text.split()
+        add_exact(english_text, hindi_text)
         
-        # Simple word-to-word mapping (this is very basic and needs improvement)
-        if len(eng_words) <= 10 and len(hindi_words) <= 10 and abs(len(eng_words) - len(hindi_words)) <= 3:
-            for eng_word in eng_words:
-                if eng_word.lower() not in new_word_map:
-                    # For simplicity, just map to first Hindi word we haven't mapped yet
-                    for hindi_word in hindi_words:
-                        if hindi_word not in new_word_map.values():
-                            new_word_map[eng_word.lower()] = hindi_word
-                            break
+        # If we have the same number of sentences, map them directly and align
+        # sentence by sentence; otherwise align the whole pair
+        sentences = split_pair(english_text, hindi_text)
+        if sentences is not None:
+            for eng_sent, hindi_sent in sentences:
+                add_exact(eng_sent, hindi_sent)
+                sentence_pairs.append((tokenize(eng_sent), tokenize_hindi(hindi_sent)))
+        else:
+            sentence_pairs.append((tokenize(english_text), tokenize_hindi(hindi_text)))
+    
+    # The counts above only cover this batch. Texts the model already has were also
+    # seen in earlier batches, so count every stored pair for them, as a rebuild would
+    for english in [english for english in new_phrase_map if english in model.phrase_map]:
+        stored = stored_translation(english)
+        if stored is not None:
+            new_phrase_map[english] = stored
+    
+    # Integer-encode the batch once; the word aligner and the phrase table share it
+    corpus = EncodedCorpus(sentence_pairs)
+    alignment_model = IBMModel1(corpus)
+    
+    # Existing word entries are kept so incremental updates only fill in words the model has not seen
+    for eng_word, hindi_word in alignment_model.best_translations().items():
+        if eng_word not in model.word_map:
+            new_word_map[eng_word] = hindi_word
+    
+    # Scored phrases from the aligned corpus fill in phrases that have no exact entry
+    with metrics.timer(STAGE_SECONDS, stage="phrase_table"):
+        phrase_table = extract_phrase_table(
+            corpus,
+            alignment_model.viterbi_alignment(),
+            max_length=PHRASE_MAX_LENGTH,
+            min_count=PHRASE_MIN_COUNT,
+            min_probability=PHRASE_MIN_PROBABILITY
+        )
+    # Compared in token form, as the phrase matcher sees them
+    exact_phrases = {" ".join(tokenize(english)) for english in new_phrase_map}
+    for phrase, translation, _, _ in phrase_table:
+        tokens = phrase.split()
+        if phrase in exact_phrases or model.matcher.longest_match(tokens, 0)[0] == len(tokens):
+            continue
+        new_phrase_map[phrase] = translation
+    
+    # Update the maps; the lock keeps a background memory build from listing keys mid-update
+    with model_lock:
+        model.word_map.update(new_word_map)
+        model.phrase_map.update(new_phrase_map)
+    model.matcher.add_phrases(new_phrase_map)
+    if model.memory is not None:
+        model.memory.add_many(new_phrase_map)
+    if model is active_model:
+        # A new version number keeps the translation cache from serving old entries
+        publish_model(model)
+    
+    # Log only the changed entries; compact into full snapshots periodically.
+    # Other processes see the delta logs change and reload
+    if persist:
+        with model_lock:
+            with metrics.timer(STAGE_SECONDS, stage="persist"):
+                word_map_file.append(new_word_map)
+                phrase_map_file.append(new_phrase_map)
+            loaded_disk_state = model_disk_state()
+            if word_map_file.needs_compaction() or phrase_map_file.needs_compaction():
+                save_translation_maps(model)
+    
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage="train_update")
+    print(f"Translation maps updated: {len(model.word_map)} words, {len(model.phrase_map)} phrases")
+
+def retract_training_pairs(pairs, model=None):
+    """Undo the exact phrase map entries that pairs contributed (after they left the store)
+    
+    An entry still holding a removed pair's translation gets the translation
+    that the remaining pairs with the same English text agree on most, or is
+    deleted if no pair has that text any more. Word and aligned phrase entries
+    are statistics over the whole corpus and change at the next rebuild.
+    """
+    global loaded_disk_state
+    model = model or active_model
+    changes = {}
     
-    # Update the global maps
-    word_translation_map.update(new_word_map)
-    phrase_translation_map.update(new_phrase_map)
+    for pair in pairs:
+        for english, hindi in exact_entries(pair):
+            if english in changes or model.phrase_map.get(english) != hindi:
+                continue
+            # Same rule as update_translation_maps: most frequent, latest on a tie
+            best = stored_translation(english)
+            if best != hindi:
+                changes[english] = best
     
-    # Save the updated maps
-    with open(TRANSLATION_MAP_PATH, 'w', encoding='utf-8') as f:
-        json.dump(word_translation_map, f, ensure_ascii=False, indent=2)
+    if not changes:
+        return changes
+    with model_lock:
+        for english, hindi in changes.items():
+            if hindi is None:
+                model.phrase_map.pop(english, None)
+                model.matcher.remove_phrase(english)
+                if model.memory is not None:
+                    model.memory.remove(english)
+            else:
+                model.phrase_map[english] = hindi
+                model.matcher.add_phrase(english, hindi)
+    if model is active_model:
+        publish_model(model)
     
-    with open(PHRASE_MAP_PATH, 'w', encoding='utf-8') as f:
-        json.dump(phrase_translation_map, f, ensure_ascii=False, indent=2)
+    # None values are logged as deletions
+    with model_lock:
+        with metrics.timer(STAGE_SECONDS, stage="persist"):
+            phrase_map_file.append(changes)
+        loaded_disk_state = model_disk_state()
+        if phrase_map_file.needs_compaction():
+            save_translation_maps(model)
     
-    print(f"Translation maps updated: {len(word_translation_map)} words, {len(phrase_translation_map)} phrases")
+    print(f"Translation maps patched: {len(changes)} phrase entries changed")
+    return changes
+
+def rebuild_translation_maps():
+    """Rebuild the translation maps from scratch (runs as a training job)"""
+    # Held for the whole rebuild: pairs added meanwhile by another worker would
+    # otherwise be dropped with the delta logs when the new snapshot is published
+    with model_writer():
+        # Check if we have training data
+        if not training_store.exists() or training_store.count() == 0:
+            raise HTTPException(status_code=400, detail="No training data available. Add data first.")
+        
+        # Build the new model off to the side while requests keep using the active one,
+        # streaming the corpus from the store
+        model = TranslationModel()
+        update_translation_maps(training_store.iter_pairs(), model=model, persist=False)
+        
+        # Save it as a new snapshot version, then swap it in with one assignment
+        with model_lock:
+            save_translation_maps(model)
+            publish_model(model)
+        
+        return {
+            "success": True,
+            "message": f"Model rebuilt successfully with {training_store.count()} pairs",
+            "word_map_size": len(model.word_map),
+            "phrase_map_size": len(model.phrase_map),
+            "snapshot_version": model.snapshot_version
+        }
 
 @app.post("/train/rebuild-model")
-async def rebuild_model():
+async def rebuild_model(background: bool = False):
     """Rebuild the translation maps from scratch using all training data"""
     try:
-        # Check if we have training data
-        if not TRAINING_DATA_PATH.exists():
-            raise HTTPException(status_code=400, detail="No training data available. Add data first.")
+        job_id = training_jobs.submit("rebuild-model", rebuild_translation_maps)
         
-        with open(TRAINING_DATA_PATH, 'r', encoding='utf-8') as f:
-            training_data = json.load(f)
+        if background:
+            return {"success": True, "message": "Model rebuild queued", "job_id": job_id}
         
-        # Clear existing maps and rebuild
-        global word_translation_map, phrase_translation_map
-        word_translation_map = {}
-        phrase_translation_map = {}
+        result = await asyncio.wrap_future(training_jobs.future(job_id))
+        return {**result, "job_id": job_id}
+    
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        logger.exception("Error rebuilding model: %s", e)
+        ERRORS_TOTAL.inc(endpoint="train_rebuild_model")
+        raise HTTPException(status_code=500, detail=f"Error rebuilding model: {str(e)}")
+
+def rollback_to_snapshot(version=None):
+    """Make an earlier snapshot the active model (runs as a training job)"""
+    global loaded_disk_state
+    with model_writer():
+        current = snapshot_store.current_version()
+        versions = snapshot_store.versions()
         
-        update_translation_maps(training_data)
+        if version is None:
+            earlier = [v for v in versions if current is None or v < current]
+            if not earlier:
+                raise HTTPException(status_code=400, detail="No earlier model snapshot to roll back to")
+            version = earlier[-1]
+        elif version not in versions:
+            raise HTTPException(status_code=404, detail=f"Model snapshot {version} not found")
+        
+        with model_lock:
+            compiled = load_compiled_model(snapshot_store.path(version))
+            model = TranslationModel(OverlayMap(compiled.words), OverlayMap(compiled.phrases), compiled, version)
+            
+            # The JSON maps follow the active snapshot, and deltas logged against the
+            # newer model are dropped once CURRENT points at the old one
+            word_map_file.write_snapshot(compiled.words)
+            phrase_map_file.write_snapshot(compiled.phrases)
+            snapshot_store.activate(version)
+            word_map_file.clear_deltas()
+            phrase_map_file.clear_deltas()
+            
+            previous = active_model
+            publish_model(model)
+            attach_translation_memory(model, previous)
+            loaded_disk_state = model_disk_state()
         
+        print(f"Rolled back to model snapshot {version}")
         return {
             "success": True,
-            "message": f"Model rebuilt successfully with {len(training_data)} pairs",
-            "word_map_size": len(word_translation_map),
-            "phrase_map_size": len(phrase_translation_map)
+            "message": f"Rolled back to model snapshot {version}",
+            "snapshot_version": version,
+            "word_map_size": len(model.word_map),
+            "phrase_map_size": len(model.phrase_map)
         }
+
+@app.get("/train/snapshots")
+async def list_model_snapshots():
+    """List the model snapshots kept on disk"""
+    return {
+        "current": snapshot_store.current_version(),
+        "versions": snapshot_store.versions(),
+        "keep": snapshot_store.keep
+    }
+
+@app.post("/train/rollback")
+async def rollback_model(version: Optional[int] = None, background: bool = False):
+    """Roll back to a kept model snapshot (the previous one by default)"""
+    try:
+        job_id = training_jobs.submit("rollback", rollback_to_snapshot, version)
+        
+        if background:
+            return {"success": True, "message": "Rollback queued", "job_id": job_id}
+        
+        result = await asyncio.wrap_future(training_jobs.future(job_id))
+        return {**result, "job_id": job_id}
     
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
-        raise HTTPException(status_code=500, detail=f"Error rebuilding model: {str(e)}")
+        logger.exception("Error rolling back model: %s", e)
+        ERRORS_TOTAL.inc(endpoint="train_rollback")
+        raise HTTPException(status_code=500, detail=f"Error rolling back model: {str(e)}")
+
+@app.get("/train/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """Report the status of a queued or finished training job"""
+    job = await asyncio.get_running_loop().run_in_executor(None, training_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job
+
+def read_training_data_status():
+    """Summarise the stored training data"""
+    if not training_store.exists():
+        return {"exists": False, "count": 0}
+    
+    return {
+        "exists": True,
+        "count": training_store.count(),
+        "sample": training_store.sample(3),
+        "word_map_size": len(active_model.word_map),
+        "phrase_map_size": len(active_model.phrase_map)
+    }
 
 @app.get("/train/data-status")
 async def get_training_data_status():
-    if not TRAINING_DATA_PATH.exists():
-        return {"exists": False, "count": 0}
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, read_training_data_status)
+    
+    except Exception as e:
+        logger.exception("Error reading training data: %s", e)
+        ERRORS_TOTAL.inc(endpoint="train_data_status")
+        raise HTTPException(status_code=500, detail=f"Error reading training data: {str(e)}")
+
+def list_training_pairs(q, field, after, limit):
+    """One page of stored pairs, optionally filtered by a full-text search"""
+    if q:
+        pairs = training_store.search(q, field=field, after_id=after, limit=limit)
+    else:
+        pairs = training_store.list_pairs(after_id=after, limit=limit)
+    return {
+        "pairs": pairs,
+        # Pass as ?after= to get the next page; None on the last page
+        "next_cursor": pairs[-1]["id"] if len(pairs) == limit else None,
+        "count": training_store.count()
+    }
+
+@app.get("/train/data")
+async def get_training_pairs(q: Optional[str] = None, field: Optional[str] = None,
+                             after: int = 0, limit: int = 50):
+    """Page through the stored pairs in id order, or search them with ?q=
     
+    The search matches pairs containing every word of q, on either side or
+    only the side named by ?field=english|hindi.
+    """
+    if not 1 <= limit <= TRAINING_DATA_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {TRAINING_DATA_PAGE_MAX}")
+    if field is not None and field not in ("english", "hindi"):
+        raise HTTPException(status_code=400, detail="field must be 'english' or 'hindi'")
     try:
-        with open(TRAINING_DATA_PATH, 'r', encoding='utf-8') as f:
-            training_data = json.load(f)
-        
-        return {
-            "exists": True,
-            "count": len(training_data),
-            "sample": training_data[:3] if training_data else [],
-            "word_map_size": len(word_translation_map),
-            "phrase_map_size": len(phrase_translation_map)
-        }
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, list_training_pairs, q, field, after, limit)
     
     except Exception as e:
+        logger.exception("Error reading training data: %s", e)
+        ERRORS_TOTAL.inc(endpoint="train_data")
         raise HTTPException(status_code=500, detail=f"Error reading training data: {str(e)}")
 
+@app.get("/train/data/{pair_id}")
+async def get_training_pair(pair_id: int):
+    loop = asyncio.get_running_loop()
+    pair = await loop.run_in_executor(None, training_store.get, pair_id)
+    if pair is None:
+        raise HTTPException(status_code=404, detail="Training pair not found")
+    return pair
+
+def update_training_pair(pair_id, english, hindi):
+    """Correct a stored pair and patch the model to match (runs as a training job)"""
+    with model_writer():
+        try:
+            changed = training_store.update(pair_id, english, hindi)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if changed is None:
+            raise HTTPException(status_code=404, detail="Training pair not found")
+        previous, pair = changed
+        
+        # Drop what the old text contributed, then train on the new text like added data
+        retract_training_pairs([previous])
+        update_translation_maps([pair])
+    
+    return {"success": True, "pair": pair, "previous": previous}
+
+def delete_training_pair(pair_id):
+    """Delete a stored pair and patch the model to match (runs as a training job)"""
+    with model_writer():
+        pair = training_store.delete(pair_id)
+        if pair is None:
+            raise HTTPException(status_code=404, detail="Training pair not found")
+        retract_training_pairs([pair])
+    
+    return {"success": True, "pair": pair, "pairs_count": training_store.count()}
+
+async def run_training_pair_job(kind, fn, *args, background=False):
+    """Run a single-pair edit as a training job, like the other training endpoints"""
+    try:
+        job_id = training_jobs.submit(kind, fn, *args)
+        
+        if background:
+            return {"success": True, "message": "Training data change queued", "job_id": job_id}
+        
+        result = await asyncio.wrap_future(training_jobs.future(job_id))
+        return {**result, "job_id": job_id}
+    
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        logger.exception("Error changing training data: %s", e)
+        ERRORS_TOTAL.inc(endpoint="train_data")
+        raise HTTPException(status_code=500, detail=f"Error changing training data: {str(e)}")
+
+@app.put("/train/data/{pair_id}")
+async def put_training_pair(pair_id: int, request: TrainingPair, background: bool = False):
+    """Replace the text of a stored pair"""
+    return await run_training_pair_job("update-pair", update_training_pair, pair_id, request.english, request.hindi,
+                                       background=background)
+
+@app.delete("/train/data/{pair_id}")
+async def remove_training_pair(pair_id: int, background: bool = False):
+    """Delete a stored pair"""
+    return await run_training_pair_job("delete-pair", delete_training_pair, pair_id, background=background)
+
 if __name__ == "__main__":
+    import sys
+    if "--prewarm" in sys.argv[1:]:
+        print(f"Model snapshot {prewarm_model()} is ready")
+        sys.exit(0)
+    
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if API_WORKERS > 1:
+        # Worker processes import the app themselves, so it is passed by name
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=API_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,95 @@
+"""Persistence for translation maps as a JSON snapshot plus an append-only delta log.
+
+Incremental training appends only the changed entries to ``<name>.delta.jsonl``;
+the delta log is folded back into the JSON snapshot once it grows past a
+threshold (see ``needs_compaction``), so each update costs I/O proportional to
+its own size. A ``null`` value in the log deletes the entry.
+"""
+
+from pathlib import Path
+import json
+import os
+
+
+class MapFile:
+    """A translation map stored as a JSON snapshot and a JSONL delta log"""
+
+    def __init__(self, path, compact_every=10000):
+        self.path = Path(path)
+        self.delta_path = self.path.with_suffix(".delta.jsonl")
+        self.compact_every = compact_every
+        self.delta_entries = 0
+
+    def load(self):
+        """Read the snapshot and replay any deltas written after it"""
+        entries = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+
+        for key, value in self.load_deltas().items():
+            if value is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = value
+        return entries
+
+    def load_deltas(self):
+        """Read only the entries logged since the last snapshot; deleted entries map to None"""
+        entries = {}
+        self.delta_entries = 0
+        if self.delta_path.exists():
+            with open(self.delta_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        delta = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted write; everything before it is valid
+                        break
+                    entries.update(delta)
+                    self.delta_entries += len(delta)
+
+        return entries
+
+    def append(self, changes):
+        """Log changed entries after the current snapshot; a None value logs a deletion"""
+        if not changes:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.delta_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(changes, ensure_ascii=False) + "\n")
+        self.delta_entries += len(changes)
+
+    def needs_compaction(self):
+        """True once the delta log has grown past the compaction threshold"""
+        return self.delta_entries >= self.compact_every
+
+    def mtime(self):
+        """Modification time of the snapshot, or 0 if there is none"""
+        return self.path.stat().st_mtime if self.path.exists() else 0
+
+    def fingerprint(self):
+        """A value that changes whenever the delta log is appended to or cleared"""
+        try:
+            stat = self.delta_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def write_snapshot(self, full_map):
+        """Replace the JSON snapshot atomically, leaving the delta log in place"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(full_map), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear_deltas(self):
+        """Drop the delta log once a snapshot containing it has been published"""
+        if self.delta_path.exists():
+            self.delta_path.unlink()
+        self.delta_entries = 0
@@ -0,0 +1,165 @@
+"""Minimal Prometheus-style metrics for the translation service.
+
+Counters, gauges and histograms are kept in process memory and rendered in the
+Prometheus text exposition format by ``MetricsRegistry.render``. When the
+registry is disabled every recording call returns immediately, so leaving the
+instrumentation in the hot path costs next to nothing.
+
+Metrics recorded inside batch worker processes stay in those processes; only
+the API process is exported.
+"""
+
+from contextlib import contextmanager
+import threading
+import time
+
+# Latency buckets in seconds, from 100 microseconds to 10 seconds
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels"""
+
+    type = "counter"
+
+    def __init__(self, registry, name, help_text, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down; usually set just before rendering"""
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram:
+    """Cumulative bucketed distribution of observed values"""
+
+    type = "histogram"
+
+    def __init__(self, registry, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self.lock:
+            items = sorted((key, list(state)) for key, state in self.values.items())
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', bound))} {count}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {state[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-2]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}"
+
+
+class _NullTimer:
+    """Context manager used in place of a histogram timer when metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for the /metrics endpoint"""
+
+    def __init__(self, enabled=True, namespace="translator"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(self, f"{self.namespace}_{name}", help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._add(Gauge(self, f"{self.namespace}_{name}", help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(self, f"{self.namespace}_{name}", help_text, labelnames, buckets))
+
+    def timer(self, histogram, **labels):
+        """Time a block into histogram, or do nothing when metrics are disabled"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return histogram.time(**labels)
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,224 @@
+"""Compiled, memory-mapped translation model.
+
+The word map, the phrase map and a token-normalised phrase index are written as
+sorted string tables into one binary file. ``load_compiled_model`` mmaps the
+file, so lookups are binary searches over the mapped pages: startup cost does
+not grow with the size of the maps, and every worker process shares one copy in
+the page cache.
+
+File layout (little endian)::
+
+    magic            8 bytes  b"GTMODEL1"
+    table headers    3 x (entry count: u64, table offset: u64)
+    table            key offsets (count + 1) x u64
+                     value offsets (count + 1) x u64
+                     key bytes, value bytes (UTF-8), padded to 8 bytes
+
+Keys are sorted by their UTF-8 bytes, which matches code point order.
+"""
+
+from collections.abc import Mapping, MutableMapping
+from pathlib import Path
+import mmap
+import os
+import struct
+
+from tokenizer import tokenize
+
+MAGIC = b"GTMODEL1"
+TABLE_NAMES = ("words", "phrases", "phrase_index")
+_HEADER = struct.Struct("<8s" + "QQ" * len(TABLE_NAMES))
+
+
+def build_phrase_index(phrase_map, min_phrase_length=2):
+    """Map token-normalised phrases ("a b c") to translations, as the phrase matcher sees them"""
+    index = {}
+    for phrase, translation in phrase_map.items():
+        tokens = tokenize(phrase)
+        if len(tokens) >= min_phrase_length:
+            index[" ".join(tokens)] = translation
+    return index
+
+
+def _encode_table(entries):
+    """Serialise a dict as sorted key/value offset arrays followed by the string data"""
+    items = sorted((key.encode("utf-8"), value.encode("utf-8")) for key, value in entries.items())
+    key_offsets, value_offsets = [0], [0]
+    for key, value in items:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+
+    data = b"".join(key for key, _ in items) + b"".join(value for _, value in items)
+    data += b"\0" * (-len(data) % 8)
+    count = len(items)
+    return count, struct.pack(f"<{count + 1}Q", *key_offsets) + struct.pack(f"<{count + 1}Q", *value_offsets) + data
+
+
+def write_compiled_model(path, word_map, phrase_map):
+    """Compile the maps into a binary model file, replacing any existing one atomically"""
+    path = Path(path)
+    tables = [
+        _encode_table(word_map),
+        _encode_table(phrase_map),
+        _encode_table(build_phrase_index(phrase_map))
+    ]
+
+    header_fields = [MAGIC]
+    offset = _HEADER.size
+    for count, blob in tables:
+        header_fields.extend((count, offset))
+        offset += len(blob)
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(*header_fields))
+        for _, blob in tables:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class CompiledTable(Mapping):
+    """Read-only str -> str mapping backed by a sorted table inside a memory map"""
+
+    def __init__(self, buffer, count, offset):
+        self.count = count
+        offsets_size = (count + 1) * 8
+        self.key_offsets = buffer[offset:offset + offsets_size].cast("Q")
+        self.value_offsets = buffer[offset + offsets_size:offset + 2 * offsets_size].cast("Q")
+        self.keys_start = offset + 2 * offsets_size
+        self.values_start = self.keys_start + self.key_offsets[count]
+        self.buffer = buffer
+
+    def _key(self, i):
+        return bytes(self.buffer[self.keys_start + self.key_offsets[i]:self.keys_start + self.key_offsets[i + 1]])
+
+    def _value(self, i):
+        start = self.values_start + self.value_offsets[i]
+        return str(self.buffer[start:self.values_start + self.value_offsets[i + 1]], "utf-8")
+
+    def _lower_bound(self, key):
+        """Index of the first stored key >= key"""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def get(self, key, default=None):
+        encoded = key.encode("utf-8")
+        i = self._lower_bound(encoded)
+        if i < self.count and self._key(i) == encoded:
+            return self._value(i)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self.get(key) is not None
+
+    def has_prefix(self, prefix):
+        """Return True if any stored key starts with prefix"""
+        encoded = prefix.encode("utf-8")
+        i = self._lower_bound(encoded)
+        return i < self.count and self._key(i).startswith(encoded)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._key(i).decode("utf-8")
+
+    def items(self):
+        for i in range(self.count):
+            yield self._key(i).decode("utf-8"), self._value(i)
+
+    def __len__(self):
+        return self.count
+
+
+class CompiledModel:
+    """A memory-mapped model file exposing its tables as mappings"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self.mmap)
+
+        fields = _HEADER.unpack_from(buffer)
+        if fields[0] != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled translation model")
+
+        for i, name in enumerate(TABLE_NAMES):
+            count, offset = fields[1 + 2 * i], fields[2 + 2 * i]
+            setattr(self, name, CompiledTable(buffer, count, offset))
+
+
+def load_compiled_model(path):
+    """Memory-map a compiled model file"""
+    return CompiledModel(path)
+
+
+class OverlayMap(MutableMapping):
+    """A mutable dict layered over a read-only compiled table
+
+    Writes and deletions go to the overlay, so incremental training can update a
+    memory-mapped model without copying it.
+    """
+
+    def __init__(self, base, overlay=None):
+        self.base = base
+        self.overlay = {}
+        self.deleted = set()
+        self.added = 0
+        if overlay:
+            for key, value in overlay.items():
+                if value is not None:
+                    self[key] = value
+                elif key in self:
+                    # A deletion logged after the base table was written
+                    del self[key]
+
+    def __getitem__(self, key):
+        if key in self.overlay:
+            return self.overlay[key]
+        if key in self.deleted:
+            raise KeyError(key)
+        return self.base[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.overlay or (key not in self.deleted and key in self.base)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self.added += 1
+        self.deleted.discard(key)
+        self.overlay[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.overlay.pop(key, None)
+        if key in self.base:
+            self.deleted.add(key)
+        self.added -= 1
+
+    def __iter__(self):
+        yield from self.overlay
+        for key in self.base:
+            if key not in self.overlay and key not in self.deleted:
+                yield key
+
+    def __len__(self):
+        return len(self.base) + self.added
@@ -0,0 +1,123 @@
+"""Compiled phrase matcher used by the translation pipeline.
+
+The phrase translation map is compiled into a token trie so that a sentence can
+be translated with a single left-to-right, longest-match-first pass over its
+tokens instead of generating and replacing every n-gram. A sorted phrase index
+from a compiled model file can back the matcher instead, with the trie holding
+only phrases added since the file was written and a set of the table phrases
+removed since.
+"""
+
+from tokenizer import tokenize
+
+# Key used to store the translation of a phrase that ends at a trie node
+_END = "\0"
+
+
+class PhraseMatcher:
+    """Token trie built from an English -> Hindi phrase map"""
+
+    def __init__(self, phrase_map=None, min_phrase_length=2, table=None):
+        self.min_phrase_length = min_phrase_length
+        self.root = {}
+        self.size = 0
+        # Optional sorted "tok tok tok" -> translation table (model_format.CompiledTable)
+        self.table = table
+        # Table phrases that were removed, as "tok tok tok" strings
+        self.removed = set()
+        if phrase_map:
+            self.add_phrases(phrase_map)
+
+    def add_phrase(self, phrase, translation):
+        """Insert a single phrase; later insertions replace earlier ones"""
+        tokens = tokenize(phrase)
+        if len(tokens) < self.min_phrase_length:
+            return
+
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+
+        if _END not in node:
+            self.size += 1
+        node[_END] = translation
+        self.removed.discard(" ".join(tokens))
+
+    def remove_phrase(self, phrase):
+        """Stop matching a phrase, whether it is in the trie or the table"""
+        tokens = tokenize(phrase)
+        node = self.root
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                break
+        else:
+            if node.pop(_END, None) is not None:
+                self.size -= 1
+        if self.table is not None and " ".join(tokens) in self.table:
+            self.removed.add(" ".join(tokens))
+
+    def add_phrases(self, phrase_map):
+        """Insert every entry of a phrase map"""
+        for phrase, translation in phrase_map.items():
+            self.add_phrase(phrase, translation)
+
+    def longest_match(self, tokens, start):
+        """Return (length, translation) of the longest phrase starting at tokens[start]"""
+        node = self.root
+        best_length, best_translation = 0, None
+
+        for i in range(start, len(tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            # Read once: a concurrent remove_phrase may drop the entry
+            translation = node.get(_END)
+            if translation is not None:
+                best_length, best_translation = i - start + 1, translation
+
+        if self.table is not None:
+            # Phrases added to the trie take precedence over equally long table entries
+            length, translation = self._longest_table_match(tokens, start)
+            if length > best_length:
+                best_length, best_translation = length, translation
+
+        return best_length, best_translation
+
+    def _longest_table_match(self, tokens, start):
+        """Walk the sorted table like a trie, using prefix searches to stop early"""
+        best_length, best_translation = 0, None
+        prefix = tokens[start]
+
+        for i in range(start, len(tokens)):
+            if i > start:
+                prefix = prefix + " " + tokens[i]
+            if i - start + 1 >= self.min_phrase_length:
+                translation = self.table.get(prefix)
+                if translation is not None and prefix not in self.removed:
+                    best_length, best_translation = i - start + 1, translation
+            if not self.table.has_prefix(prefix + " "):
+                break
+
+        return best_length, best_translation
+
+    def translate_tokens(self, tokens, word_map):
+        """Translate tokens with phrase matches first, then single-word lookups"""
+        output = []
+        i = 0
+
+        while i < len(tokens):
+            length, translation = self.longest_match(tokens, i)
+            if length:
+                output.append(translation)
+                i += length
+                continue
+
+            token = tokens[i]
+            output.append(word_map.get(token, token))
+            i += 1
+
+        return output
+
+    def __len__(self):
+        return self.size + (len(self.table) - len(self.removed) if self.table is not None else 0)
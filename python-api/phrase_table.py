@@ -0,0 +1,145 @@
+"""Vectorised phrase-table extraction from a word-aligned corpus.
+
+Works on an ``aligner.EncodedCorpus`` and its IBM Model 1 Viterbi alignment
+(one English position per Hindi token). For every English n-gram occurrence,
+the Hindi span covered by its alignment links is the candidate translation,
+provided no Hindi word inside that span is linked to a word outside the n-gram
+(the usual alignment-consistency rule) and both edge words are linked.
+
+N-grams and Hindi spans are reduced to dense integer ids with ``np.unique``.
+Co-occurrences are counted with one more ``np.unique`` over id pairs. Each
+phrase is scored p(hindi | english) = count(english, hindi) / count(english),
+and pruned by count and probability. Memory is linear in the number of tokens
+times the maximum phrase length.
+"""
+
+import numpy as np
+
+from aligner import first_max_per_group
+
+
+def _span_keys(ids, max_length):
+    """keys[n - 1][i] identifies the token sequence ids[i:i + n], for n = 1..max_length
+
+    Keys of each length are re-densified with np.unique, so multiplying a key by
+    the vocabulary size to append the next token never overflows int64.
+    """
+    keys = [ids]
+    vocab_size = int(ids.max()) + 1 if len(ids) else 1
+    for n in range(2, max_length + 1):
+        if len(ids) < n:
+            keys.append(np.zeros(0, dtype=np.int64))
+            continue
+        combined = keys[-1][:len(ids) - n + 1] * vocab_size + ids[n - 1:]
+        keys.append(np.unique(combined, return_inverse=True)[1].astype(np.int64))
+    return keys
+
+
+def extract_phrase_table(corpus, alignment, max_length=4, max_hindi_length=None,
+                         min_count=2, min_probability=0.3):
+    """Return the best translation of each English phrase as (english, hindi, count, probability)
+
+    Phrases are 2..max_length English tokens long. A translation is kept if it
+    was extracted at least min_count times and accounts for at least
+    min_probability of the phrase's occurrences.
+    """
+    if not len(corpus) or max_length < 2:
+        return []
+    max_hindi_length = max_hindi_length or max_length + 2
+
+    # English tokens without the NULL entry that starts each sentence
+    real = np.ones(len(corpus.english_ids), dtype=bool)
+    real[corpus.english_starts] = False
+    english_ids = corpus.english_ids[real]
+    english_lengths = corpus.english_lengths - 1
+    english_starts = np.cumsum(english_lengths) - english_lengths
+    english_sentence = np.repeat(np.arange(len(corpus)), english_lengths)
+    english_end = (english_starts + english_lengths)[english_sentence]
+
+    # Global index of the English token each Hindi token is linked to (NULL links dropped)
+    hindi_sentence = np.repeat(np.arange(len(corpus)), corpus.hindi_lengths)
+    linked = alignment > 0
+    linked_hindi = np.flatnonzero(linked)
+    linked_english = english_starts[hindi_sentence[linked]] + alignment[linked] - 1
+    linked_prefix = np.r_[0, np.cumsum(linked)]
+
+    # Per English token: number of links and the first/last linked Hindi position
+    token_count = np.bincount(linked_english, minlength=len(english_ids))
+    token_min = np.full(len(english_ids), len(alignment), dtype=np.int64)
+    token_max = np.full(len(english_ids), -1, dtype=np.int64)
+    np.minimum.at(token_min, linked_english, linked_hindi)
+    np.maximum.at(token_max, linked_english, linked_hindi)
+    span_count, span_min, span_max = token_count, token_min, token_max
+
+    english_keys = _span_keys(english_ids, max_length)
+    hindi_keys = _span_keys(corpus.hindi_ids, max_hindi_length)
+    hindi_offsets = np.cumsum([0] + [len(keys) for keys in hindi_keys])
+
+    phrase_totals = []
+    candidates = []
+    english_offset = 0
+
+    for n in range(2, max_length + 1):
+        starts = len(english_ids) - n + 1
+        if starts <= 0:
+            break
+        # Extend the n-1 spans by one token to the right
+        span_count = span_count[:starts] + token_count[n - 1:]
+        span_min = np.minimum(span_min[:starts], token_min[n - 1:])
+        span_max = np.maximum(span_max[:starts], token_max[n - 1:])
+
+        occurrence = np.flatnonzero(np.arange(starts) + n <= english_end[:starts])
+        keys = english_keys[n - 1][occurrence]
+        phrase_totals.append(np.bincount(keys, minlength=len(english_keys[n - 1])))
+
+        lo, hi, count = span_min[occurrence], span_max[occurrence], span_count[occurrence]
+        # Both edge words must be linked, otherwise an unaligned edge word would be
+        # dropped from the translation; unlinked words inside the span (articles) are fine
+        consistent = (token_count[occurrence] > 0) & (token_count[occurrence + n - 1] > 0)
+        consistent &= hi - lo < max_hindi_length
+        consistent[consistent] &= linked_prefix[hi[consistent] + 1] - linked_prefix[lo[consistent]] == count[consistent]
+
+        occurrence, keys, lo, hi = occurrence[consistent], keys[consistent], lo[consistent], hi[consistent]
+        hindi_length = hi - lo + 1
+        hindi_key = np.empty(len(lo), dtype=np.int64)
+        for length in range(1, max_hindi_length + 1):
+            selected = hindi_length == length
+            hindi_key[selected] = hindi_keys[length - 1][lo[selected]] + hindi_offsets[length - 1]
+
+        candidates.append((keys + english_offset, hindi_key, occurrence, np.full(len(lo), n), lo, hindi_length))
+        english_offset += len(english_keys[n - 1])
+
+    if not candidates:
+        return []
+
+    phrase_key, hindi_key, english_start, english_length, hindi_start, hindi_length = (
+        np.concatenate(column) for column in zip(*candidates)
+    )
+    phrase_totals = np.concatenate(phrase_totals)
+
+    # Count each (English phrase, Hindi span) pair; unique keys come out grouped by phrase
+    pair_keys, first, pair_counts = np.unique(
+        phrase_key * int(hindi_offsets[-1]) + hindi_key, return_index=True, return_counts=True
+    )
+    pair_phrase = pair_keys // int(hindi_offsets[-1])
+    probabilities = pair_counts / phrase_totals[pair_phrase]
+
+    kept = np.flatnonzero((pair_counts >= min_count) & (probabilities >= min_probability))
+    if not len(kept):
+        return []
+    group_starts = np.flatnonzero(np.r_[True, pair_phrase[kept][1:] != pair_phrase[kept][:-1]])
+    best = kept[first_max_per_group(pair_counts[kept], group_starts)]
+
+    english_words = corpus.english_words()
+    hindi_words = corpus.hindi_words()
+    table = []
+    for pair in best:
+        occurrence = first[pair]
+        start, hindi = english_start[occurrence], hindi_start[occurrence]
+        table.append((
+            " ".join(english_words[english_ids[start:start + english_length[occurrence]]]),
+            " ".join(hindi_words[corpus.hindi_ids[hindi:hindi + hindi_length[occurrence]]]),
+            int(pair_counts[pair]),
+            float(probabilities[pair])
+        ))
+    return table
@@ -0,0 +1,90 @@
+"""Versioned snapshots of the compiled translation model.
+
+Each full save writes a new ``model-<version>.bin`` (see ``model_format``) into
+the snapshot directory, then repoints the ``CURRENT`` file at it with an atomic
+rename. Readers in any process therefore always open a complete model, and can
+notice a new version by checking ``fingerprint``. The newest ``keep`` snapshots
+stay on disk so a bad model can be rolled back with ``activate``.
+"""
+
+from pathlib import Path
+import os
+import re
+
+from model_format import write_compiled_model
+
+_SNAPSHOT_NAME = re.compile(r"^model-(\d+)\.bin$")
+
+
+class SnapshotStore:
+    """A directory of compiled model snapshots plus a CURRENT pointer file"""
+
+    def __init__(self, directory, keep=5):
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self.pointer_path = self.directory / "CURRENT"
+
+    def path(self, version):
+        return self.directory / f"model-{version:06d}.bin"
+
+    def versions(self):
+        """Snapshot versions present on disk, oldest first"""
+        if not self.directory.exists():
+            return []
+        versions = []
+        for path in self.directory.iterdir():
+            match = _SNAPSHOT_NAME.match(path.name)
+            if match:
+                versions.append(int(match.group(1)))
+        return sorted(versions)
+
+    def current_version(self):
+        """Version named by CURRENT, or None if nothing usable has been published"""
+        try:
+            version = int(self.pointer_path.read_text().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+        return version if self.path(version).exists() else None
+
+    def mtime(self):
+        """When CURRENT was last repointed, or 0 if it does not exist"""
+        return self.pointer_path.stat().st_mtime if self.pointer_path.exists() else 0
+
+    def fingerprint(self):
+        """A value that changes every time CURRENT is repointed"""
+        try:
+            stat = self.pointer_path.stat()
+        except FileNotFoundError:
+            return None
+        # os.replace gives the pointer a new inode, so equal mtimes are still told apart
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def write(self, word_map, phrase_map):
+        """Compile the maps into the next snapshot file without activating it"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        versions = self.versions()
+        version = versions[-1] + 1 if versions else 1
+        write_compiled_model(self.path(version), word_map, phrase_map)
+        return version
+
+    def activate(self, version):
+        """Atomically point CURRENT at an existing snapshot"""
+        if not self.path(version).exists():
+            raise KeyError(version)
+        tmp_path = self.pointer_path.with_suffix(".tmp")
+        tmp_path.write_text(f"{version}\n")
+        os.replace(tmp_path, self.pointer_path)
+
+    def prune(self):
+        """Delete all but the newest `keep` snapshots, never the current one"""
+        current = self.current_version()
+        for version in self.versions()[:-self.keep]:
+            if version != current:
+                self.path(version).unlink(missing_ok=True)
+
+    def publish(self, word_map, phrase_map):
+        """Write a new snapshot, make it current and prune old ones; returns its version"""
+        version = self.write(word_map, phrase_map)
+        self.activate(version)
+        self.prune()
+        return version
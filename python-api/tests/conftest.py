@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# The service modules are flat files in python-api/, imported by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# main.py reads its paths at import time; keep the tests' model files out of the checkout
+os.environ.setdefault("TRANSLATOR_MODEL_DIR", tempfile.mkdtemp(prefix="translator-models-"))
+os.environ.setdefault("TRANSLATOR_DOCUMENT_DIR", tempfile.mkdtemp(prefix="translator-documents-"))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One app per test session: shutting the app down stops its executors for good"""
+    import main
+    
+    with TestClient(main.app) as client:
+        yield client
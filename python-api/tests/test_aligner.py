@@ -0,0 +1,21 @@
+from aligner import EncodedCorpus, IBMModel1
+
+
+def best_translations(pairs):
+    corpus = EncodedCorpus([(english.split(), hindi.split()) for english, hindi in pairs])
+    return IBMModel1(corpus).best_translations()
+
+
+def test_single_sentence_maps_no_words():
+    # Every Hindi word is equally likely for every English word, so none is chosen
+    assert best_translations([("pension arrears disbursed quarterly", "पेंशन बकाया तिमाही वितरित")]) == {}
+
+
+def test_words_separated_by_other_sentences_are_mapped():
+    translations = best_translations([
+        ("pension arrears", "पेंशन बकाया"),
+        ("pension rules", "पेंशन नियम"),
+        ("service rules", "सेवा नियम"),
+    ])
+    assert translations["pension"] == "पेंशन"
+    assert translations["rules"] == "नियम"
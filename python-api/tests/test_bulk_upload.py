@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Small batches, so pairs before the malformed rows are committed first
+    monkeypatch.setattr(main, "BULK_INSERT_BATCH", 2)
+
+
+def jsonl(rows):
+    return "".join(line + "\n" for line in rows).encode("utf-8")
+
+
+def test_malformed_rows_are_rejected_and_stored_pairs_trained(client):
+    rows = [
+        json.dumps({"english": "The tender notice is published", "hindi": "निविदा सूचना प्रकाशित है"}),
+        json.dumps({"english": "The office remains closed", "hindi": "कार्यालय बंद रहता है"}),
+        json.dumps({"english": 5, "hindi": "पांच"}),
+        json.dumps({"english": None, "hindi": "कुछ नहीं"}),
+        json.dumps(["not", "an", "object"]),
+        "{not json",
+        json.dumps({"english": "The library opens at nine", "hindi": "पुस्तकालय नौ बजे खुलता है"}),
+    ]
+    count = client.get("/train/data").json()["count"]
+    
+    response = client.post("/train/bulk-upload", params={"data_format": "jsonl"}, content=jsonl(rows))
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pairs_added"] == 3
+    assert data["pairs_rejected"] == 4
+    assert data["pairs_count"] == count + 3
+    assert data["trained"]
+    for english, hindi in [("The office remains closed", "कार्यालय बंद रहता है"),
+                           ("The library opens at nine", "पुस्तकालय नौ बजे खुलता है")]:
+        assert client.post("/translate", json={"text": english}).json()["translation"] == hindi
+
+
+def test_upload_over_the_byte_limit_is_refused(client, monkeypatch):
+    monkeypatch.setattr(main, "TRAINING_UPLOAD_MAX_BYTES", 64)
+    rows = [json.dumps({"english": f"Sentence number {i}", "hindi": f"वाक्य संख्या {i}"}) for i in range(10)]
+    count = client.get("/train/data").json()["count"]
+    
+    response = client.post("/train/bulk-upload", params={"data_format": "jsonl"}, content=jsonl(rows))
+    
+    assert response.status_code == 413
+    assert client.get("/train/data").json()["count"] == count
@@ -0,0 +1,24 @@
+import sqlite3
+import time
+
+from jobs import JobRegistry
+
+
+def test_submit_does_not_wait_for_a_locked_store(tmp_path):
+    path = tmp_path / "jobs.db"
+    registry = JobRegistry(store_path=path)
+    other_worker = JobRegistry(store_path=path)
+    assert other_worker.get("missing") is None
+    
+    blocker = sqlite3.connect(path)
+    blocker.execute("BEGIN EXCLUSIVE")
+    started = time.perf_counter()
+    job_id = registry.submit("test", lambda: {"ok": True})
+    registry.report(job_id, percent=50.0)
+    assert time.perf_counter() - started < 1.0
+    blocker.rollback()
+    blocker.close()
+    
+    registry.future(job_id).result()
+    registry.shutdown()
+    assert other_worker.get(job_id)["status"] == "completed"
@@ -0,0 +1,14 @@
+import main
+
+
+def test_plain_text_over_the_byte_limit_is_refused(client, monkeypatch):
+    monkeypatch.setattr(main, "STREAM_MAX_BYTES", 64)
+    response = client.post(
+        "/translate/stream", content=("word " * 20).encode("utf-8"), headers={"Content-Type": "text/plain"}
+    )
+    assert response.status_code == 413
+
+
+def test_malformed_json_body_is_rejected(client):
+    response = client.post("/translate/stream", content=b"{not json", headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
@@ -0,0 +1,10 @@
+def test_most_frequent_translation_wins_across_batches(client):
+    english = "The inspection visit is postponed."
+    common, rare = "निरीक्षण दौरा स्थगित है।", "निरीक्षण यात्रा टाल दी गई है।"
+    for hindi in [common, common, common, rare]:
+        pairs = [{"english": english, "hindi": hindi}]
+        assert client.post("/train/add-data", json={"training_pairs": pairs}).status_code == 200
+    
+    translation = client.post("/translate", json={"text": english}).json()["translation"]
+    
+    assert translation == common.rstrip("।")
@@ -0,0 +1,20 @@
+import json
+
+from training_store import TrainingStore
+
+
+def test_legacy_json_is_not_reimported_after_every_pair_is_deleted(tmp_path):
+    legacy_path = tmp_path / "training_data.json"
+    legacy_path.write_text(json.dumps([
+        {"english": "The office is closed", "hindi": "कार्यालय बंद है"},
+        {"english": "The form is available", "hindi": "प्रपत्र उपलब्ध है"},
+    ]), encoding="utf-8")
+    
+    store = TrainingStore(tmp_path / "training_data.db", legacy_json_path=legacy_path)
+    assert store.count() == 2
+    for pair in store.list_pairs(after_id=0, limit=10):
+        store.delete(pair["id"])
+    assert store.count() == 0
+    
+    reopened = TrainingStore(tmp_path / "training_data.db", legacy_json_path=legacy_path)
+    assert reopened.count() == 0
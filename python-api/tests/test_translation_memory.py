@@ -0,0 +1,71 @@
+from translation_memory import TranslationMemory
+
+
+def memory_with(*keys, min_similarity=0.5):
+    memory = TranslationMemory(min_similarity=min_similarity, min_tokens=3)
+    memory.add_many(keys)
+    return memory
+
+
+def test_matches_sentence_that_differs_only_in_articles():
+    memory = memory_with("submit the application form to the office by friday")
+    match = memory.lookup("submit application form to the office by friday".split())
+    assert match is not None
+    assert match[0] == "submit the application form to the office by friday"
+
+
+def test_rejects_match_with_a_different_number():
+    memory = memory_with("applications must reach the office by 300 pm")
+    assert memory.lookup("applications must reach the office by 500 pm".split()) is None
+
+
+def test_rejects_match_that_drops_a_negation():
+    memory = memory_with("submit the application form to the office")
+    assert memory.lookup("do not submit the application form to the office".split()) is None
+
+
+def test_rejects_match_with_a_different_content_word():
+    memory = memory_with("the results will be announced this month")
+    assert memory.lookup("the results will be announced next month".split()) is None
+
+
+def test_falls_back_to_a_less_similar_compatible_match():
+    memory = memory_with(
+        "the results will be announced this month on the website",
+        "results will be announced next month on website",
+    )
+    match = memory.lookup("the results will be announced next month on the website".split())
+    assert match is not None
+    assert match[0] == "results will be announced next month on website"
+
+
+def test_indexes_keys_with_the_query_tokenizer():
+    memory = memory_with("the budget for the year was approved.", min_similarity=0.9)
+    match = memory.lookup("the budget for the year was approved".split())
+    assert match == ("the budget for the year was approved.", 1.0)
+
+
+def test_removed_key_no_longer_hides_the_next_match():
+    memory = memory_with(
+        "the results will be announced on the website",
+        "results will be announced on website",
+    )
+    query = "the results will be announced on the website".split()
+    assert memory.lookup(query)[0] == "the results will be announced on the website"
+    assert memory.remove("the results will be announced on the website")
+    assert memory.lookup(query)[0] == "results will be announced on website"
+    assert len(memory) == 1
+
+
+def test_keys_differing_in_punctuation_resolve_the_same_in_any_order():
+    keys = ["the budget for the year was approved.", "the budget for the year was approved"]
+    query = "the budget for the year was approved".split()
+    assert memory_with(*keys).lookup(query) == memory_with(*reversed(keys)).lookup(query)
+    memory = memory_with(*keys)
+    assert memory.remove("the budget for the year was approved")
+    assert memory.lookup(query)[0] == "the budget for the year was approved."
+
+
+def test_rejects_match_with_swapped_roles():
+    memory = memory_with("the applicant must pay the fee to the department")
+    assert memory.lookup("the department must pay the fee to the applicant".split()) is None
@@ -0,0 +1,139 @@
+"""Single-pass tokenizer shared by translation and training.
+
+``iter_paragraphs`` scans a document once with one precompiled pattern that
+finds both paragraph breaks and sentence terminators: ASCII ``.!?`` and the
+Devanagari danda ``।`` and double danda ``॥``. Each ``Sentence`` keeps its
+offsets in the document and its normalised text. Its word tokens are built on
+first use and then reused, so later stages never lowercase or re-split a
+sentence again. Sentences answered from the cache or the phrase map never build
+tokens at all. ``clause_chunks`` cuts overlong sentences at clause boundaries
+so they can be translated piece by piece.
+"""
+
+import re
+
+# Paragraph breaks and runs of sentence terminators, found in a single scan
+_BOUNDARY = re.compile(r"\n\n|[.!?।॥]+")
+_TERMINATORS = re.compile(r"[.!?।॥]+")
+# Anything that is neither a word character nor whitespace is dropped from English tokens
+_NON_WORD = re.compile(r"[^\w\s]")
+# Whitespace other than line breaks, which decide paragraph boundaries
+_INLINE_SPACE = re.compile(r"[^\S\n]+")
+# Clause boundaries inside a sentence: , ; : and dashes, and the space before a conjunction
+_CLAUSE_BREAK = re.compile(
+    r"[,;:\u2013\u2014]|\s(?=(?:and|or|but|which|who|where|while|because|although|unless)\b)",
+    re.IGNORECASE
+)
+# Punctuation dropped from Hindi tokens; \w would also drop the matras, so it is listed explicitly
+_HINDI_PUNCTUATION = re.compile(r'[।॥|.,;:!?"\'()\[\]{}\-]')
+
+
+def normalize(text):
+    """Lowercase text and collapse runs of whitespace (the phrase map and cache key form)"""
+    return " ".join(text.lower().split())
+
+
+def document_key(text):
+    """Key under which texts with identical translations compare equal
+
+    Translation lowercases every sentence and ignores runs of spaces, but paragraph
+    breaks are kept, so only line breaks survive.
+    """
+    return _INLINE_SPACE.sub(" ", text.strip().lower())
+
+
+def tokenize(text):
+    """Split English text into lowercase word tokens with punctuation removed"""
+    return _NON_WORD.sub("", text.lower()).split()
+
+
+def tokenize_hindi(text):
+    """Split Hindi text into words, dropping danda and punctuation but keeping matras"""
+    return _HINDI_PUNCTUATION.sub(" ", text).split()
+
+
+def clause_chunks(text, max_tokens):
+    """Split an overlong sentence into lists of at most max_tokens tokens, cut at clause boundaries
+
+    Adjacent clauses are merged while they fit, so a sentence is only cut where
+    it has a boundary; a single clause that is still too long is cut every
+    max_tokens tokens.
+    """
+    chunks = []
+    current = []
+    for clause in _CLAUSE_BREAK.split(text):
+        tokens = tokenize(clause)
+        if current and len(current) + len(tokens) > max_tokens:
+            chunks.append(current)
+            current = []
+        current.extend(tokens)
+        while len(current) > max_tokens:
+            chunks.append(current[:max_tokens])
+            current = current[max_tokens:]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_sentences(text):
+    """Split text into stripped sentence strings at .!? and danda, ignoring paragraph breaks"""
+    return [sentence.strip() for sentence in _TERMINATORS.split(text) if sentence.strip()]
+
+
+class Sentence:
+    """One sentence of a document: its text, offsets, normalised form and tokens"""
+
+    __slots__ = ("source", "text", "start", "end", "normalized", "_tokens")
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.text = source[start:end]
+        self.normalized = normalize(self.text)
+        self._tokens = None
+
+    @property
+    def tokens(self):
+        """Lowercase word tokens, built on first use"""
+        if self._tokens is None:
+            self._tokens = _NON_WORD.sub("", self.normalized).split()
+        return self._tokens
+
+    def __repr__(self):
+        return f"Sentence({self.text!r}, {self.start}, {self.end})"
+
+
+def _append_sentence(text, start, end, sentences):
+    """Add text[start:end] without surrounding whitespace, if anything is left"""
+    segment = text[start:end]
+    left = segment.lstrip()
+    if not left:
+        return
+    start += len(segment) - len(left)
+    sentences.append(Sentence(text, start, start + len(left.rstrip())))
+
+
+def iter_paragraphs(text):
+    """Yield each paragraph of text as a list of Sentences, in document order
+
+    Paragraphs are separated by a blank line ("\\n\\n"); an empty paragraph
+    yields an empty list so paragraph breaks can be reproduced exactly.
+    """
+    sentences = []
+    start = 0
+
+    for match in _BOUNDARY.finditer(text):
+        _append_sentence(text, start, match.start(), sentences)
+        start = match.end()
+        if text[match.start()] == "\n":
+            yield sentences
+            sentences = []
+
+    _append_sentence(text, start, len(text), sentences)
+    yield sentences
+
+
+def tokenize_sentences(text):
+    """All Sentences of text, ignoring paragraph breaks"""
+    return [sentence for paragraph in iter_paragraphs(text) for sentence in paragraph]
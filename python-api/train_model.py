@@ -1,12 +1,19 @@
-import requests
 import pandas as pd
-import json
-import time
+
+from translator_client import TranslatorClient, TranslatorError
 
 # Configuration
 API_URL = "http://localhost:8000"
 TRAINING_DATA_FILE = "govt_training_data.csv"
 
+# Pairs sent per bulk upload request; the server stores them in one job
+UPLOAD_CHUNK_SIZE = 5000
+# Give up on an upload after this many back-pressure (503/429) responses
+MAX_UPLOAD_ATTEMPTS = 8
+
+# One pooled client for every request; busy responses are resent honouring Retry-After
+client = TranslatorClient(base_url=API_URL, retries=MAX_UPLOAD_ATTEMPTS)
+
 def load_csv_data(file_path):
     """Load training data from CSV file"""
     try:
@@ -15,15 +22,13 @@ def load_csv_data(file_path):
             print(f"Error: CSV must contain 'english' and 'hindi' columns")
             return []
         
-        # Convert to list of dictionaries
-        training_pairs = []
-        for _, row in df.iterrows():
-            if isinstance(row['english'], str) and isinstance(row['hindi'], str):
-                if row['english'].strip() and row['hindi'].strip():
-                    training_pairs.append({
-                        "english": row['english'].strip(),
-                        "hindi": row['hindi'].strip()
-                    })
+        # Clean both columns in one vectorized pass instead of row by row
+        df = df[['english', 'hindi']].dropna()
+        english = df['english'].astype(str).str.strip()
+        hindi = df['hindi'].astype(str).str.strip()
+        df = pd.DataFrame({'english': english, 'hindi': hindi})
+        df = df[(df['english'] != "") & (df['hindi'] != "")]
+        training_pairs = df.to_dict('records')
         
         print(f"Loaded {len(training_pairs)} training pairs from {file_path}")
         return training_pairs
@@ -34,53 +39,41 @@ def load_csv_data(file_path):
 def check_api_status():
     """Check if the API is running"""
     try:
-        response = requests.get(f"{API_URL}/health")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"API Status: {data.get('status', 'Unknown')}")
-            print(f"Model Status: {data.get('model_status', 'Unknown')}")
-            print(f"Word Map Size: {data.get('word_map_size', 0)}")
-            print(f"Phrase Map Size: {data.get('phrase_map_size', 0)}")
-            return True
+        data = client.health()
+        print(f"API Status: {data.get('status', 'Unknown')}")
+        print(f"Model Status: {data.get('model_status', 'Unknown')}")
+        print(f"Word Map Size: {data.get('word_map_size', 0)}")
+        print(f"Phrase Map Size: {data.get('phrase_map_size', 0)}")
+        return True
+    except TranslatorError as e:
+        if e.status_code is None:
+            print("Connection error: Could not connect to the API. Make sure the API server is running.")
         else:
-            print(f"API returned status code: {response.status_code}")
-            return False
-    except requests.exceptions.ConnectionError:
-        print("Connection error: Could not connect to the API. Make sure the API server is running.")
+            print(str(e))
         return False
     except Exception as e:
         print(f"Error checking API status: {str(e)}")
         return False
 
 def add_training_data(training_pairs):
-    """Add training data to the model"""
+    """Upload training data in large JSONL chunks; the model is trained once afterwards"""
     try:
-        # Process in batches to avoid overwhelming the API
-        batch_size = 10
         total_pairs = len(training_pairs)
         
-        for i in range(0, total_pairs, batch_size):
-            end_idx = min(i + batch_size, total_pairs)
-            batch = training_pairs[i:end_idx]
-            
-            print(f"Adding batch {i//batch_size + 1} ({len(batch)} pairs)...")
+        for i in range(0, total_pairs, UPLOAD_CHUNK_SIZE):
+            chunk = training_pairs[i:i + UPLOAD_CHUNK_SIZE]
+            print(f"Uploading pairs {i + 1}-{i + len(chunk)} of {total_pairs}...")
             
-            response = requests.post(
-                f"{API_URL}/train/add-data",
-                json={"training_pairs": batch}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"Success! Total pairs now: {data.get('pairs_count', 0)}")
-            else:
-                print(f"Failed to add training data: {response.status_code}")
-                return False
-            
-            # Small delay to prevent overwhelming the API
-            time.sleep(1)
+            # Stored without training; the client waits while the server reports it is busy
+            data = client.upload_training_pairs(chunk, train=False)
+            print(f"Success! Total pairs now: {data.get('pairs_count', 0)}")
+            if data.get("pairs_rejected"):
+                print(f"Skipped {data['pairs_rejected']} rows without English and Hindi text")
         
         return True
+    except TranslatorError as e:
+        print(f"Failed to add training data: {str(e)}")
+        return False
     except Exception as e:
         print(f"Error adding training data: {str(e)}")
         return False
@@ -89,17 +82,14 @@ def rebuild_model():
     """Rebuild the translation model"""
     try:
         print("Rebuilding model...")
-        response = requests.post(f"{API_URL}/train/rebuild-model")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"Model rebuilt successfully: {data.get('message', '')}")
-            print(f"Word Map Size: {data.get('word_map_size', 0)}")
-            print(f"Phrase Map Size: {data.get('phrase_map_size', 0)}")
-            return True
-        else:
-            print(f"Failed to rebuild model: {response.status_code}")
-            return False
+        data = client.rebuild_model()
+        print(f"Model rebuilt successfully: {data.get('message', '')}")
+        print(f"Word Map Size: {data.get('word_map_size', 0)}")
+        print(f"Phrase Map Size: {data.get('phrase_map_size', 0)}")
+        return True
+    except TranslatorError as e:
+        print(f"Failed to rebuild model: {str(e)}")
+        return False
     except Exception as e:
         print(f"Error rebuilding model: {str(e)}")
         return False
@@ -108,25 +98,17 @@ def test_translation(test_sentences):
     """Test the trained model with some sample sentences"""
     print("\nTesting the trained model...")
     
-    for sentence in test_sentences:
-        try:
-            response = requests.post(
-                f"{API_URL}/translate",
-                json={"text": sentence, "preserve_formatting": True}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("success"):
-                    print(f"\nEnglish: {sentence}")
-                    print(f"Hindi:   {data.get('translation', '')}")
-                else:
-                    print(f"Translation error: {data.get('error', 'Unknown error')}")
+    try:
+        # The client sends these through the batch endpoint in one round trip
+        for result in client.translate_many(test_sentences):
+            if result.get("success"):
+                print(f"\nEnglish: {result.get('source_text', '')}")
+                print(f"Hindi:   {result.get('translation', '')}")
             else:
-                print(f"API returned status code: {response.status_code}")
-        
-        except Exception as e:
-            print(f"Error testing translation: {str(e)}")
+                print(f"Translation error: {result.get('error', 'Unknown error')}")
+    
+    except Exception as e:
+        print(f"Error testing translation: {str(e)}")
 
 def main():
     print("====== Government Document Translation Model Training ======")
@@ -146,7 +128,7 @@ def main():
     if not add_training_data(training_pairs):
         print("Failed to add all training data.")
     
-    # Rebuild model for good measure
+    # Uploads skip training, so build the model once over the whole corpus
     rebuild_model()
     
     # Check final status
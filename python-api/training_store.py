@@ -0,0 +1,305 @@
+"""Storage for parallel training data.
+
+Pairs live in a SQLite database so new data can be appended without reading or
+rewriting the existing corpus. A legacy ``training_data.json`` file is imported
+the first time the store is opened, and only then: a ``store_meta`` row records
+that the import was considered, so deleting every pair does not bring the
+legacy corpus back.
+
+Triggers keep two derived structures in step with the pairs table: a row count,
+so counting the corpus does not scan it, and an FTS5 full-text index over both
+the English and the Hindi side. Listing and search page through the corpus with
+an id cursor, so a page costs the same however deep into the corpus it is. If
+SQLite was built without FTS5, search falls back to scanning with LIKE.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import sqlite3
+
+# Devanagari vowel signs and viramas are marks (M*); without them in the token
+# categories every Hindi word would be split at each sign
+FTS_TOKENIZERS = ("unicode61 categories 'L* N* Co M*'", "unicode61")
+SEARCH_FIELDS = ("english", "hindi")
+
+
+class TrainingStore:
+    """SQLite-backed store of English/Hindi training pairs"""
+
+    def __init__(self, path, legacy_json_path=None):
+        self.path = Path(path)
+        self.legacy_json_path = Path(legacy_json_path) if legacy_json_path else None
+        self.initialized = False
+        # True once the full-text index exists; set by initialize
+        self.searchable = False
+
+    @contextmanager
+    def connect(self):
+        """Open a connection, committing on success and rolling back on error"""
+        if not self.initialized:
+            self.initialize()
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def initialize(self):
+        """Create the schema and, the first time, import legacy JSON training data into an empty store"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Other workers may be initializing the same file; one at a time creates the schema
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS training_pairs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "english TEXT NOT NULL, "
+                "hindi TEXT NOT NULL)"
+            )
+            self._create_count(conn)
+            self.searchable = self._create_search_index(conn)
+            conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            considered = conn.execute("SELECT 1 FROM store_meta WHERE key = 'legacy_imported'").fetchone()
+            if considered is None:
+                empty = conn.execute("SELECT 1 FROM training_pairs LIMIT 1").fetchone() is None
+                if empty and self.legacy_json_path and self.legacy_json_path.exists():
+                    with open(self.legacy_json_path, 'r', encoding='utf-8') as f:
+                        legacy_pairs = clean_pairs(json.load(f))
+                    conn.executemany(
+                        "INSERT INTO training_pairs (english, hindi) VALUES (?, ?)",
+                        ((pair["english"], pair["hindi"]) for pair in legacy_pairs)
+                    )
+                    print(f"Imported {len(legacy_pairs)} training pairs from {self.legacy_json_path}")
+                # Recorded whether or not anything was imported, in the same transaction
+                conn.execute("INSERT INTO store_meta (key, value) VALUES ('legacy_imported', '1')")
+            conn.commit()
+        finally:
+            conn.close()
+        self.initialized = True
+
+    @staticmethod
+    def _create_count(conn):
+        """Create the row count and the triggers that maintain it, counting existing rows once"""
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS corpus_stats ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), "
+            "pairs INTEGER NOT NULL)"
+        )
+        conn.execute("INSERT OR IGNORE INTO corpus_stats (id, pairs) SELECT 1, COUNT(*) FROM training_pairs")
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS training_pairs_counted AFTER INSERT ON training_pairs BEGIN "
+            "UPDATE corpus_stats SET pairs = pairs + 1 WHERE id = 1; END"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS training_pairs_uncounted AFTER DELETE ON training_pairs BEGIN "
+            "UPDATE corpus_stats SET pairs = pairs - 1 WHERE id = 1; END"
+        )
+
+    @staticmethod
+    def _create_search_index(conn):
+        """Create the full-text index and its triggers; returns False if FTS5 is unavailable"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'training_pairs_fts'"
+        ).fetchone() is not None
+        if not exists:
+            for tokenizer in FTS_TOKENIZERS:
+                try:
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE training_pairs_fts USING fts5("
+                        "english, hindi, content='training_pairs', content_rowid='id', "
+                        f"tokenize=\"{tokenizer}\")"
+                    )
+                    break
+                except sqlite3.OperationalError:
+                    continue
+            else:
+                return False
+            # Index the pairs stored before the index existed
+            conn.execute("INSERT INTO training_pairs_fts (training_pairs_fts) VALUES ('rebuild')")
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS training_pairs_indexed AFTER INSERT ON training_pairs BEGIN "
+            "INSERT INTO training_pairs_fts (rowid, english, hindi) VALUES (new.id, new.english, new.hindi); END"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS training_pairs_unindexed AFTER DELETE ON training_pairs BEGIN "
+            "INSERT INTO training_pairs_fts (training_pairs_fts, rowid, english, hindi) "
+            "VALUES ('delete', old.id, old.english, old.hindi); END"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS training_pairs_reindexed AFTER UPDATE ON training_pairs BEGIN "
+            "INSERT INTO training_pairs_fts (training_pairs_fts, rowid, english, hindi) "
+            "VALUES ('delete', old.id, old.english, old.hindi); "
+            "INSERT INTO training_pairs_fts (rowid, english, hindi) VALUES (new.id, new.english, new.hindi); END"
+        )
+        return True
+
+    def exists(self):
+        return self.path.exists() or bool(self.legacy_json_path and self.legacy_json_path.exists())
+
+    def add_pairs(self, pairs):
+        """Append valid pairs and return the cleaned pairs that were stored"""
+        cleaned = clean_pairs(pairs)
+        with self.connect() as conn:
+            conn.executemany(
+                "INSERT INTO training_pairs (english, hindi) VALUES (?, ?)",
+                ((pair["english"], pair["hindi"]) for pair in cleaned)
+            )
+        return cleaned
+
+    def iter_pairs(self, batch_size=1000, after_id=0):
+        """Yield stored pairs in insertion order without loading the whole corpus
+
+        Only pairs with an id greater than after_id are returned.
+        """
+        last_id = after_id
+        while True:
+            with self.connect() as conn:
+                rows = conn.execute(
+                    "SELECT id, english, hindi FROM training_pairs WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row_id, english, hindi in rows:
+                yield {"english": english, "hindi": hindi}
+            last_id = rows[-1][0]
+
+    def last_id(self):
+        """Id of the most recently stored pair, or 0 for an empty store"""
+        with self.connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM training_pairs").fetchone()[0]
+
+    def count(self):
+        """Number of stored pairs, read from the trigger-maintained count"""
+        with self.connect() as conn:
+            return conn.execute("SELECT pairs FROM corpus_stats WHERE id = 1").fetchone()[0]
+
+    def sample(self, limit=3):
+        """Return the first few stored pairs"""
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT english, hindi FROM training_pairs ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"english": english, "hindi": hindi} for english, hindi in rows]
+
+    def get(self, pair_id):
+        """Return the pair with id pair_id as {id, english, hindi}, or None"""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT id, english, hindi FROM training_pairs WHERE id = ?", (pair_id,)
+            ).fetchone()
+        return _pair(row) if row else None
+
+    def list_pairs(self, after_id=0, limit=50):
+        """Return up to limit pairs with an id greater than after_id, in id order"""
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT id, english, hindi FROM training_pairs WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit)
+            ).fetchall()
+        return [_pair(row) for row in rows]
+
+    def search(self, text, field=None, after_id=0, limit=50):
+        """Return up to limit pairs containing every word of text, in id order after after_id
+
+        field restricts the search to the "english" or "hindi" side; by default
+        a word may occur on either side.
+        """
+        if field is not None and field not in SEARCH_FIELDS:
+            raise ValueError(f"field must be one of: {', '.join(SEARCH_FIELDS)}")
+        words = [word for word in text.split() if any(character.isalnum() for character in word)]
+        if not words:
+            return []
+
+        with self.connect() as conn:
+            if self.searchable:
+                # Each word is quoted as an FTS5 phrase, so user input is never parsed as query syntax
+                column = f"{field} : " if field else ""
+                query = " ".join(column + '"' + word.replace('"', '""') + '"' for word in words)
+                rows = conn.execute(
+                    "SELECT rowid, english, hindi FROM training_pairs_fts "
+                    "WHERE training_pairs_fts MATCH ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (query, after_id, limit)
+                ).fetchall()
+            else:
+                fields = [field] if field else list(SEARCH_FIELDS)
+                conditions = []
+                parameters = []
+                for word in words:
+                    pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                    conditions.append("(" + " OR ".join(f"{name} LIKE ? ESCAPE '\\'" for name in fields) + ")")
+                    parameters.extend([pattern] * len(fields))
+                rows = conn.execute(
+                    "SELECT id, english, hindi FROM training_pairs "
+                    f"WHERE {' AND '.join(conditions)} AND id > ? ORDER BY id LIMIT ?",
+                    (*parameters, after_id, limit)
+                ).fetchall()
+        return [_pair(row) for row in rows]
+
+    def iter_search(self, text, field=None, batch_size=1000):
+        """Yield every pair matching search(text, field), a page at a time"""
+        after_id = 0
+        while True:
+            pairs = self.search(text, field=field, after_id=after_id, limit=batch_size)
+            yield from pairs
+            if len(pairs) < batch_size:
+                return
+            after_id = pairs[-1]["id"]
+
+    def update(self, pair_id, english, hindi):
+        """Replace the text of a pair; returns (old pair, new pair), or None if there is no such pair"""
+        cleaned = clean_pairs([{"english": english, "hindi": hindi}])
+        if not cleaned:
+            raise ValueError("English and Hindi text cannot be empty")
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT id, english, hindi FROM training_pairs WHERE id = ?", (pair_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE training_pairs SET english = ?, hindi = ? WHERE id = ?",
+                (cleaned[0]["english"], cleaned[0]["hindi"], pair_id)
+            )
+        return _pair(row), {"id": pair_id, **cleaned[0]}
+
+    def delete(self, pair_id):
+        """Delete a pair; returns the deleted pair, or None if there is no such pair"""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT id, english, hindi FROM training_pairs WHERE id = ?", (pair_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM training_pairs WHERE id = ?", (pair_id,))
+        return _pair(row)
+
+
+def _pair(row):
+    pair_id, english, hindi = row
+    return {"id": pair_id, "english": english, "hindi": hindi}
+
+
+def clean_pairs(pairs):
+    """Keep pairs with non-empty English and Hindi text, stripped of surrounding whitespace
+
+    Anything else (a row that is not an object, a missing, null or non-string
+    value) is dropped rather than failing the whole batch.
+    """
+    cleaned = []
+    for pair in pairs:
+        if not isinstance(pair, dict):
+            continue
+        english, hindi = pair.get("english"), pair.get("hindi")
+        if isinstance(english, str) and isinstance(hindi, str):
+            english, hindi = english.strip(), hindi.strip()
+            if english and hindi:
+                cleaned.append({"english": english, "hindi": hindi})
+    return cleaned
@@ -0,0 +1,230 @@
+"""Translation memory: approximate matching of stored sentences.
+
+Every indexed sentence is reduced to its word tokens (``tokenizer.tokenize``,
+as for the query) and split into character
+trigrams. An inverted index maps each trigram to the sorted ids of the
+sentences that contain it. A lookup uses prefix filtering. A sentence whose
+Jaccard similarity to the query is at least ``min_similarity`` shares at least
+``ceil(min_similarity * |query|)`` trigrams with the query. It must therefore
+appear in one of the rarest ``|query| - ceil(min_similarity * |query|) + 1``
+posting lists, so only those lists produce candidates.
+
+The remaining posting lists are then merged in, rarest first, with vectorised
+binary searches. A candidate is dropped as soon as it can no longer reach the
+overlap that its size requires. Lookup cost therefore depends on how rare the
+query's trigrams are, not on how many sentences are stored.
+
+Trigram similarity alone cannot tell "by 3:00 PM" from "by 5:00 PM", or
+"submit" from "do not submit", and it ignores word order, so "the department
+must pay the applicant" matches "the applicant must pay the department". A
+candidate is therefore only accepted if its words are the query's words in
+the same order, apart from articles: numbers, negations, content words and
+their positions must all match exactly. Candidates are tried from the most
+similar down, so a near miss does not hide a valid match.
+
+Postings are immutable NumPy arrays plus short lists of recently added ids,
+which are merged in once enough of them accumulate. Lookups read a consistent
+(frozen, pending) pair without locking; writers are serialised by a lock.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from tokenizer import tokenize
+
+_EMPTY = np.zeros(0, dtype=np.uint32)
+# The only words a match may add or drop; anything else (a number, a negation,
+# a content word) changes the meaning of the sentence
+INTERCHANGEABLE_WORDS = frozenset({"a", "an", "the"})
+
+
+def trigrams(text):
+    """Set of character trigrams of text, padded so word edges count"""
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def interchangeable(query, stored):
+    """True if the token lists are equal, in order, once INTERCHANGEABLE_WORDS are dropped"""
+    return ([word for word in query if word not in INTERCHANGEABLE_WORDS]
+            == [word for word in stored if word not in INTERCHANGEABLE_WORDS])
+
+
+class TranslationMemory:
+    """Character-trigram inverted index over phrase map keys"""
+
+    def __init__(self, min_similarity=0.75, min_tokens=5, merge_every=50000):
+        self.min_similarity = min_similarity
+        self.min_tokens = min_tokens
+        self.merge_every = merge_every
+        # Entry id -> phrase map key (None once removed), and the number of distinct trigrams of each entry
+        self.keys = []
+        self.sizes = np.zeros(1024, dtype=np.uint32)
+        # Token-normalised text -> entry id, so each sentence is indexed once
+        self.ids = {}
+        # Entry id -> every key of the entry, for the few entries whose keys differ only in
+        # punctuation; the entry reports the smallest, whatever order they were added in
+        self.aliases = {}
+        # (trigram -> sorted id array, trigram -> ids added since the last merge)
+        self.index = ({}, {})
+        self.pending_postings = 0
+        # False while a background build is still indexing the phrase map
+        self.ready = False
+        self.lock = threading.Lock()
+
+    def add(self, key, tokens=None):
+        """Index a phrase map key; returns False if it is too short or already indexed"""
+        tokens = tokenize(key) if tokens is None else tokens
+        if len(tokens) < self.min_tokens:
+            return False
+        text = " ".join(tokens)
+        grams = trigrams(text)
+
+        with self.lock:
+            entry = self.ids.get(text)
+            if entry is not None:
+                aliases = self.aliases.setdefault(entry, {self.keys[entry]})
+                aliases.add(key)
+                self.keys[entry] = min(aliases)
+                return False
+            entry = len(self.keys)
+            if entry == len(self.sizes):
+                # Grow by copying; lookups holding the old array only use older ids
+                sizes = np.zeros(2 * len(self.sizes), dtype=np.uint32)
+                sizes[:entry] = self.sizes
+                self.sizes = sizes
+            self.sizes[entry] = len(grams)
+            self.keys.append(key)
+            self.ids[text] = entry
+
+            # The id goes into the postings last, once everything it refers to exists
+            pending = self.index[1]
+            for gram in grams:
+                posting = pending.get(gram)
+                if posting is None:
+                    pending[gram] = [entry]
+                else:
+                    posting.append(entry)
+            self.pending_postings += len(grams)
+            if self.pending_postings >= self.merge_every:
+                self._merge()
+        return True
+
+    def add_many(self, keys):
+        """Index every key in keys"""
+        for key in keys:
+            self.add(key)
+        with self.lock:
+            self._merge()
+
+    def remove(self, key):
+        """Stop matching a key that left the phrase map; returns False if it was not indexed
+
+        Its ids stay in the postings and are skipped by lookups.
+        """
+        text = " ".join(tokenize(key))
+        with self.lock:
+            entry = self.ids.get(text)
+            if entry is None:
+                return False
+            aliases = self.aliases.get(entry)
+            if aliases is not None and key in aliases:
+                aliases.discard(key)
+                self.keys[entry] = min(aliases)
+                if len(aliases) == 1:
+                    del self.aliases[entry]
+                return True
+            if self.keys[entry] != key:
+                return False
+            del self.ids[text]
+            self.keys[entry] = None
+        return True
+
+    def _merge(self):
+        """Fold the pending ids into new frozen arrays (caller holds the lock)"""
+        frozen, pending = self.index
+        if not pending:
+            return
+        merged = dict(frozen)
+        for gram, ids in pending.items():
+            added = np.asarray(ids, dtype=np.uint32)
+            existing = merged.get(gram)
+            merged[gram] = added if existing is None else np.concatenate((existing, added))
+        self.index = (merged, {})
+        self.pending_postings = 0
+
+    def lookup(self, tokens):
+        """Return (key, similarity) of the most similar compatible sentence at or above the threshold, or None
+
+        Compatible means the stored sentence has the same words as tokens, in the
+        same order, apart from articles (see ``interchangeable``).
+        """
+        if len(tokens) < self.min_tokens or not self.ids:
+            return None
+
+        frozen, pending = self.index
+        query = trigrams(" ".join(tokens))
+        query_size = len(query)
+        threshold = self.min_similarity
+
+        postings = []
+        for gram in query:
+            posting = frozen.get(gram, _EMPTY)
+            recent = pending.get(gram)
+            if recent:
+                posting = np.concatenate((posting, np.asarray(recent, dtype=np.uint32)))
+            postings.append(posting)
+        postings.sort(key=len)
+        # Read after the postings: every id seen there already has its size in this array
+        sizes = self.sizes
+
+        # Candidates come from the rarest trigrams only
+        prefix = max(1, query_size - math.ceil(threshold * query_size) + 1)
+        ids = np.concatenate(postings[:prefix])
+        if len(ids) * 8 > len(sizes):
+            # Dense postings: one counter per entry is cheaper than sorting the ids
+            counts = np.bincount(ids, minlength=len(sizes))
+            candidates = np.flatnonzero(counts)
+            counts = counts[candidates]
+        else:
+            candidates, counts = np.unique(ids, return_counts=True)
+        if not len(candidates):
+            return None
+
+        # Jaccard >= threshold needs size within [t * |q|, |q| / t] and
+        # overlap >= t * (|q| + size) / (1 + t)
+        size = sizes[candidates].astype(np.int64)
+        keep = (size >= threshold * query_size) & (size <= query_size / threshold)
+        candidates, counts, size = candidates[keep], counts[keep], size[keep]
+        required = np.ceil(threshold * (query_size + size) / (1 + threshold) - 1e-9)
+
+        for k in range(prefix, query_size):
+            alive = counts + (query_size - k) >= required
+            if not alive.all():
+                candidates, counts, size, required = candidates[alive], counts[alive], size[alive], required[alive]
+            if not len(candidates):
+                return None
+            posting = postings[k]
+            if not len(posting):
+                continue
+            position = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+            counts = counts + (posting[position] == candidates)
+
+        if not len(candidates):
+            return None
+        similarity = counts / (query_size + size - counts)
+        for best in np.argsort(-similarity, kind="stable"):
+            if similarity[best] < threshold:
+                break
+            key = self.keys[int(candidates[best])]
+            if key is not None and interchangeable(tokens, tokenize(key)):
+                return key, float(similarity[best])
+        return None
+
+    def stats(self):
+        return {"entries": len(self.ids), "ready": self.ready}
+
+    def __len__(self):
+        return len(self.ids)
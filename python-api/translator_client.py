@@ -0,0 +1,377 @@
+"""Client for the translation API, with a synchronous and an asyncio interface.
+
+Each client holds one httpx connection pool, so requests reuse keep-alive
+connections instead of opening a new one per call. Every request has a
+timeout. Connection failures are retried by the transport, and 429/503
+back-pressure responses are retried a bounded number of times, honouring
+Retry-After.
+
+``translate_many`` sends texts to /translate/batch in chunks, with several
+chunks in flight at once. Against a server without the batch endpoint it
+falls back to concurrent /translate calls.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import time
+
+import httpx
+
+DEFAULT_URL = os.getenv("TRANSLATOR_API_URL", "http://localhost:8000")
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# Long-running training calls (rebuilds, large uploads) wait this long for a response
+TRAINING_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+# Statuses the server uses for "busy, send again later"; the request was not processed
+RETRY_STATUSES = (429, 503)
+
+
+class TranslatorError(Exception):
+    """A request to the translation API failed"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _retry_delay(response, attempt, backoff):
+    """Seconds to wait before resending: Retry-After if given, otherwise exponential backoff"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return min(backoff * 2 ** attempt, 30.0)
+
+
+def _check(response):
+    """Raise TranslatorError for an error response"""
+    if response.status_code < 400:
+        return
+    try:
+        body = response.json()
+        detail = body.get("detail") or body.get("message") if isinstance(body, dict) else None
+    except ValueError:
+        detail = None
+    raise TranslatorError(
+        f"API returned status code {response.status_code}" + (f": {detail}" if detail else ""),
+        status_code=response.status_code
+    )
+
+
+def _translation(data):
+    """The translation from a /translate response body"""
+    if not data.get("success"):
+        raise TranslatorError(f"Translation error: {data.get('error') or 'Unknown error'}")
+    return data["translation"]
+
+
+def _jsonl(pairs):
+    return "".join(json.dumps(pair, ensure_ascii=False) + "\n" for pair in pairs).encode("utf-8")
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _result(text, translation=None, error=None):
+    """A per-text result in the shape of the batch endpoint's responses"""
+    return {"translation": translation or "", "source_text": text, "success": error is None, "error": error}
+
+
+def _page_params(query, field, after, limit):
+    params = {"after": after, "limit": limit}
+    if query:
+        params["q"] = query
+    if field:
+        params["field"] = field
+    return params
+
+
+def _transport_error(error):
+    return TranslatorError(f"Could not connect to the translation API: {error}")
+
+
+class TranslatorClient:
+    """Synchronous client; safe to share between threads"""
+
+    def __init__(self, base_url=DEFAULT_URL, timeout=DEFAULT_TIMEOUT, max_connections=8,
+                 retries=3, backoff=0.5, batch_size=64, concurrency=4, transport=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        # None until the first translate_many finds out whether /translate/batch exists
+        self.batch_supported = None
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.http = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            transport=transport or httpx.HTTPTransport(retries=retries, limits=limits)
+        )
+
+    def request(self, method, path, **kwargs):
+        """Send a request, resending on 429/503; raises TranslatorError on failure"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.http.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                raise _transport_error(e) from e
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                _check(response)
+                return response
+            time.sleep(_retry_delay(response, attempt, self.backoff))
+
+    def health(self):
+        return self.request("GET", "/health").json()
+
+    def translate(self, text):
+        """Translate one text and return the Hindi translation"""
+        response = self.request("POST", "/translate", json={"text": text, "preserve_formatting": True})
+        if response.status_code == 202:
+            # Long texts are queued as a job by the server
+            return self.wait_for_job(response.json()["status_url"])["result"]["translation"]
+        return _translation(response.json())
+
+    def _translate_chunk(self, texts):
+        if self.batch_supported is not False:
+            try:
+                response = self.request("POST", "/translate/batch", json={"texts": texts, "preserve_formatting": True})
+                self.batch_supported = True
+                return response.json()["translations"]
+            except TranslatorError as e:
+                if e.status_code not in (404, 405):
+                    raise
+                self.batch_supported = False
+        return [self._translate_one(text) for text in texts]
+
+    def _translate_one(self, text):
+        try:
+            return _result(text, translation=self.translate(text))
+        except TranslatorError as e:
+            return _result(text, error=str(e))
+
+    def translate_many(self, texts):
+        """Translate a list of texts; returns one {translation, source_text, success, error} dict per text"""
+        chunks = _chunks(list(texts), self.batch_size)
+        if len(chunks) <= 1:
+            return [result for chunk in chunks for result in self._translate_chunk(chunk)]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return [result for chunk in pool.map(self._translate_chunk, chunks) for result in chunk]
+
+    def stream_translation(self, text):
+        """Yield the NDJSON pieces of /translate/stream as they arrive"""
+        try:
+            with self.http.stream(
+                "POST", "/translate/stream",
+                content=text.encode("utf-8"),
+                headers={"Content-Type": "text/plain; charset=utf-8"}
+            ) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    _check(response)
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+        except httpx.TransportError as e:
+            raise _transport_error(e) from e
+
+    def upload_training_pairs(self, pairs, train=False):
+        """Send pairs to /train/bulk-upload as one JSONL body"""
+        response = self.request(
+            "POST", "/train/bulk-upload",
+            params={"data_format": "jsonl", "train": str(train).lower()},
+            content=_jsonl(pairs),
+            headers={"Content-Type": "application/x-ndjson"},
+            timeout=TRAINING_TIMEOUT
+        )
+        return response.json()
+
+    def rebuild_model(self):
+        return self.request("POST", "/train/rebuild-model", timeout=TRAINING_TIMEOUT).json()
+
+    def training_pairs(self, query=None, field=None, after=0, limit=50):
+        """One page of stored pairs, optionally searched; pass next_cursor as after for the next page"""
+        return self.request("GET", "/train/data", params=_page_params(query, field, after, limit)).json()
+
+    def update_training_pair(self, pair_id, english, hindi):
+        return self.request(
+            "PUT", f"/train/data/{pair_id}", json={"english": english, "hindi": hindi}, timeout=TRAINING_TIMEOUT
+        ).json()
+
+    def delete_training_pair(self, pair_id):
+        return self.request("DELETE", f"/train/data/{pair_id}", timeout=TRAINING_TIMEOUT).json()
+
+    def translate_file(self, content, filename, poll_interval=1.0, on_progress=None):
+        """Translate a .txt/.csv/.docx file through a file job; returns (translated bytes, filename)
+
+        on_progress(percent) is called while the job runs.
+        """
+        job_id = self.request("POST", "/translate/file", params={"filename": filename}, content=content).json()["job_id"]
+        job = self.wait_for_job(f"/translate/file/{job_id}", poll_interval, on_progress)
+        response = self.request("GET", f"/translate/file/{job_id}/result")
+        return response.content, job["result"]["filename"]
+
+    def wait_for_job(self, status_url, poll_interval=1.0, on_progress=None):
+        """Poll a translation job until it completes and return it; raises TranslatorError if it fails"""
+        while True:
+            job = self.request("GET", status_url).json()
+            if job["status"] == "failed":
+                raise TranslatorError(f"Translation error: {job.get('error') or 'Unknown error'}")
+            if job["status"] == "completed":
+                return job
+            if on_progress is not None and job.get("progress"):
+                on_progress(job["progress"]["percent"])
+            time.sleep(poll_interval)
+
+    def close(self):
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncTranslatorClient:
+    """asyncio client with the same methods as TranslatorClient"""
+
+    def __init__(self, base_url=DEFAULT_URL, timeout=DEFAULT_TIMEOUT, max_connections=8,
+                 retries=3, backoff=0.5, batch_size=64, concurrency=4, transport=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.batch_supported = None
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            transport=transport or httpx.AsyncHTTPTransport(retries=retries, limits=limits)
+        )
+
+    async def request(self, method, path, **kwargs):
+        """Send a request, resending on 429/503; raises TranslatorError on failure"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.http.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                raise _transport_error(e) from e
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                _check(response)
+                return response
+            await asyncio.sleep(_retry_delay(response, attempt, self.backoff))
+
+    async def health(self):
+        return (await self.request("GET", "/health")).json()
+
+    async def translate(self, text):
+        """Translate one text and return the Hindi translation"""
+        response = await self.request("POST", "/translate", json={"text": text, "preserve_formatting": True})
+        if response.status_code == 202:
+            job = await self.wait_for_job(response.json()["status_url"])
+            return job["result"]["translation"]
+        return _translation(response.json())
+
+    async def _translate_chunk(self, texts, semaphore):
+        async with semaphore:
+            if self.batch_supported is not False:
+                try:
+                    response = await self.request(
+                        "POST", "/translate/batch", json={"texts": texts, "preserve_formatting": True}
+                    )
+                    self.batch_supported = True
+                    return response.json()["translations"]
+                except TranslatorError as e:
+                    if e.status_code not in (404, 405):
+                        raise
+                    self.batch_supported = False
+        return await asyncio.gather(*(self._translate_one(text, semaphore) for text in texts))
+
+    async def _translate_one(self, text, semaphore):
+        async with semaphore:
+            try:
+                return _result(text, translation=await self.translate(text))
+            except TranslatorError as e:
+                return _result(text, error=str(e))
+
+    async def translate_many(self, texts):
+        """Translate a list of texts; returns one {translation, source_text, success, error} dict per text"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        chunks = await asyncio.gather(
+            *(self._translate_chunk(chunk, semaphore) for chunk in _chunks(list(texts), self.batch_size))
+        )
+        return [result for chunk in chunks for result in chunk]
+
+    async def stream_translation(self, text):
+        """Yield the NDJSON pieces of /translate/stream as they arrive"""
+        try:
+            async with self.http.stream(
+                "POST", "/translate/stream",
+                content=text.encode("utf-8"),
+                headers={"Content-Type": "text/plain; charset=utf-8"}
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    _check(response)
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+        except httpx.TransportError as e:
+            raise _transport_error(e) from e
+
+    async def upload_training_pairs(self, pairs, train=False):
+        """Send pairs to /train/bulk-upload as one JSONL body"""
+        response = await self.request(
+            "POST", "/train/bulk-upload",
+            params={"data_format": "jsonl", "train": str(train).lower()},
+            content=_jsonl(pairs),
+            headers={"Content-Type": "application/x-ndjson"},
+            timeout=TRAINING_TIMEOUT
+        )
+        return response.json()
+
+    async def rebuild_model(self):
+        return (await self.request("POST", "/train/rebuild-model", timeout=TRAINING_TIMEOUT)).json()
+
+    async def training_pairs(self, query=None, field=None, after=0, limit=50):
+        """One page of stored pairs, optionally searched; pass next_cursor as after for the next page"""
+        return (await self.request("GET", "/train/data", params=_page_params(query, field, after, limit))).json()
+
+    async def update_training_pair(self, pair_id, english, hindi):
+        response = await self.request(
+            "PUT", f"/train/data/{pair_id}", json={"english": english, "hindi": hindi}, timeout=TRAINING_TIMEOUT
+        )
+        return response.json()
+
+    async def delete_training_pair(self, pair_id):
+        return (await self.request("DELETE", f"/train/data/{pair_id}", timeout=TRAINING_TIMEOUT)).json()
+
+    async def translate_file(self, content, filename, poll_interval=1.0, on_progress=None):
+        """Translate a .txt/.csv/.docx file through a file job; returns (translated bytes, filename)"""
+        response = await self.request("POST", "/translate/file", params={"filename": filename}, content=content)
+        job_id = response.json()["job_id"]
+        job = await self.wait_for_job(f"/translate/file/{job_id}", poll_interval, on_progress)
+        response = await self.request("GET", f"/translate/file/{job_id}/result")
+        return response.content, job["result"]["filename"]
+
+    async def wait_for_job(self, status_url, poll_interval=1.0, on_progress=None):
+        """Poll a translation job until it completes and return it; raises TranslatorError if it fails"""
+        while True:
+            job = (await self.request("GET", status_url)).json()
+            if job["status"] == "failed":
+                raise TranslatorError(f"Translation error: {job.get('error') or 'Unknown error'}")
+            if job["status"] == "completed":
+                return job
+            if on_progress is not None and job.get("progress"):
+                on_progress(job["progress"]["percent"])
+            await asyncio.sleep(poll_interval)
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()